@@ -1,6 +1,7 @@
 import time
 from typing import Dict, Any
 from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi.responses import StreamingResponse
 from typing import Optional, List, Dict, Any
 
 from .models import (
@@ -8,21 +9,15 @@ from .models import (
     HealthResponse, SourceDocument
 )
 from .auth import verify_jwt_token
-from rag import get_structured_rag_answer
+from rag import aget_structured_rag_answer, astream_structured_rag_answer
 from utils import get_logger
 
 # 라우터 생성
 router = APIRouter()
 
-@router.post("/chat", response_model=ChatResponse)
-async def chat_endpoint(request: ChatRequest): # ChatRequest 모델 사용
+def authenticate_request(request: ChatRequest):
+    """JWT 토큰 검증 (실패 시 401)"""
     logger = get_logger(__name__)
-    start_time = time.time()
-    
-    # 요청 로깅
-    logger.info(f"새로운 채팅 요청 - 질문: {request.query[:100]}{'...' if len(request.query) > 100 else ''}")
-    
-    # 1. JWT 토큰 검증
     try:
         logger.debug("JWT 토큰 검증 시작")
         verify_jwt_token(request.jwtToken)
@@ -34,62 +29,93 @@ async def chat_endpoint(request: ChatRequest): # ChatRequest 모델 사용
             detail=f"JWT 인증 실패: {str(e)}"
         )
 
-    def transform_character_data(raw_data: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
-        """
-        원본 캐릭터 JSON 데이터를 RAG 서비스 및 프롬프트에 사용하기 적합한 형태로 변환합니다.
-        """
-        if not raw_data:
-            return None
-
-        transformed = {}
-
-        # 1. job: jobGrowName과 jobName 조합
-        job_grow_name = raw_data.get("jobGrowName", "")
-        job_name = raw_data.get("jobName", "")
-        if job_grow_name and job_name:
-            processed_grow_name = job_grow_name.replace("眞 ", "")
-            transformed["job"] = f"{processed_grow_name}({job_name.split('(')[-1]}" if '(' in job_name else f"{processed_grow_name}({job_name})"
-
-        # 2. fame
-        if "fame" in raw_data:
-            transformed["fame"] = raw_data.get("fame")
-
-        # 3. weapon: weaponEquip의 itemRarity 사용
-        weapon_equip = raw_data.get("weaponEquip")
-        if isinstance(weapon_equip, dict) and "itemRarity" in weapon_equip:
-            transformed["weapon"] = f"{weapon_equip['itemRarity']} 무기"
-
-        # 4. epicNum (에픽 개수)
-        if "epicNum" in raw_data:
-            transformed["epicNum"] = raw_data.get("epicNum")
-
-        # 5. originalityNum (태초 개수)
-        if "originalityNum" in raw_data:
-            transformed["originalityNum"] = raw_data.get("originalityNum")
-
-        # 6. title: titleName 사용
-        if "titleName" in raw_data:
-            transformed["title"] = raw_data.get("titleName")
-
-        # 7. setItemName & 8. setItemRarityName
-        set_item_info_ai = raw_data.get("setItemInfoAI")
-        if isinstance(set_item_info_ai, list) and len(set_item_info_ai) > 0:
-            first_set_item = set_item_info_ai[0]
-            if isinstance(first_set_item, dict):
-                if "setItemName" in first_set_item:
-                    transformed["set_item_name"] = first_set_item.get("setItemName")
-                if "setItemRarityName" in first_set_item:
-                    transformed["set_item_rarity"] = first_set_item.get("setItemRarityName")
-        
-        # 9. creature: creatureName 사용
-        if "creatureName" in raw_data:
-            transformed["creature"] = raw_data.get("creatureName")
 
-        # 10. aura: auraName 사용
-        if "auraName" in raw_data:
-            transformed["aura"] = raw_data.get("auraName")
-            
-        return transformed if transformed else None
+def transform_character_data(raw_data: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    원본 캐릭터 JSON 데이터를 RAG 서비스 및 프롬프트에 사용하기 적합한 형태로 변환합니다.
+    """
+    if not raw_data:
+        return None
+
+    transformed = {}
+
+    # 1. job: jobGrowName과 jobName 조합
+    job_grow_name = raw_data.get("jobGrowName", "")
+    job_name = raw_data.get("jobName", "")
+    if job_grow_name and job_name:
+        processed_grow_name = job_grow_name.replace("眞 ", "")
+        transformed["job"] = f"{processed_grow_name}({job_name.split('(')[-1]}" if '(' in job_name else f"{processed_grow_name}({job_name})"
+
+    # 2. fame
+    if "fame" in raw_data:
+        transformed["fame"] = raw_data.get("fame")
+
+    # 3. weapon: weaponEquip의 itemRarity 사용
+    weapon_equip = raw_data.get("weaponEquip")
+    if isinstance(weapon_equip, dict) and "itemRarity" in weapon_equip:
+        transformed["weapon"] = f"{weapon_equip['itemRarity']} 무기"
+
+    # 4. epicNum (에픽 개수)
+    if "epicNum" in raw_data:
+        transformed["epicNum"] = raw_data.get("epicNum")
+
+    # 5. originalityNum (태초 개수)
+    if "originalityNum" in raw_data:
+        transformed["originalityNum"] = raw_data.get("originalityNum")
+
+    # 6. title: titleName 사용
+    if "titleName" in raw_data:
+        transformed["title"] = raw_data.get("titleName")
+
+    # 7. setItemName & 8. setItemRarityName
+    set_item_info_ai = raw_data.get("setItemInfoAI")
+    if isinstance(set_item_info_ai, list) and len(set_item_info_ai) > 0:
+        first_set_item = set_item_info_ai[0]
+        if isinstance(first_set_item, dict):
+            if "setItemName" in first_set_item:
+                transformed["set_item_name"] = first_set_item.get("setItemName")
+            if "setItemRarityName" in first_set_item:
+                transformed["set_item_rarity"] = first_set_item.get("setItemRarityName")
+
+    # 9. creature: creatureName 사용
+    if "creatureName" in raw_data:
+        transformed["creature"] = raw_data.get("creatureName")
+
+    # 10. aura: auraName 사용
+    if "auraName" in raw_data:
+        transformed["aura"] = raw_data.get("auraName")
+
+    return transformed if transformed else None
+
+
+def build_conversation_history(request: ChatRequest) -> List[Dict[str, str]]:
+    """이전 질문/답변 리스트를 대화 기록 형식으로 변환"""
+    logger = get_logger(__name__)
+    conversation_history = []
+    if request.beforeQuestionList and request.beforeResponseList:
+        # 두 리스트의 길이가 다를 수 있으므로 최소 길이로 맞춤
+        min_length = min(len(request.beforeQuestionList), len(request.beforeResponseList))
+        for i in range(min_length):
+            conversation_history.extend([
+                {"role": "user", "content": request.beforeQuestionList[i]},
+                {"role": "assistant", "content": request.beforeResponseList[i]}
+            ])
+        logger.info(f"이전 대화 기록: {len(conversation_history)//2}개 대화")
+    else:
+        logger.info("이전 대화 기록 없음")
+    return conversation_history
+
+
+@router.post("/chat", response_model=ChatResponse)
+async def chat_endpoint(request: ChatRequest): # ChatRequest 모델 사용
+    logger = get_logger(__name__)
+    start_time = time.time()
+    
+    # 요청 로깅
+    logger.info(f"새로운 채팅 요청 - 질문: {request.query[:100]}{'...' if len(request.query) > 100 else ''}")
+    
+    # 1. JWT 토큰 검증
+    authenticate_request(request)
 
     try:
         # 1) 캐릭터 정보 변환
@@ -103,24 +129,13 @@ async def chat_endpoint(request: ChatRequest): # ChatRequest 모델 사용
 
         # 2) 이전 대화 기록 처리
         logger.debug("이전 대화 기록 처리 시작")
-        conversation_history = []
-        if request.beforeQuestionList and request.beforeResponseList:
-            # 두 리스트의 길이가 다를 수 있으므로 최소 길이로 맞춤
-            min_length = min(len(request.beforeQuestionList), len(request.beforeResponseList))
-            for i in range(min_length):
-                conversation_history.extend([
-                    {"role": "user", "content": request.beforeQuestionList[i]},
-                    {"role": "assistant", "content": request.beforeResponseList[i]}
-                ])
-            logger.info(f"이전 대화 기록: {len(conversation_history)//2}개 대화")
-        else:
-            logger.info("이전 대화 기록 없음")
+        conversation_history = build_conversation_history(request)
 
         # 3) RAG 호출 시, 변환된 character_info와 conversation_history 전달
         logger.info(f"RAG 질문 처리 시작: {request.query}")
         rag_start_time = time.time()
         
-        rag_result = get_structured_rag_answer(
+        rag_result = await aget_structured_rag_answer(
             request.query,
             character_info=transformed_char_info, # 변환된 딕셔너리 전달
             conversation_history=conversation_history # 이전 대화 기록 전달
@@ -191,4 +206,27 @@ async def chat_endpoint(request: ChatRequest): # ChatRequest 모델 사용
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"RAG 처리 중 오류가 발생했습니다: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+
+@router.post("/chat/stream")
+async def chat_stream_endpoint(request: ChatRequest):
+    """답변을 생성되는 대로 텍스트 조각으로 전송 (text/plain 스트리밍)
+
+    요청 형식은 /chat과 같고, 출처/디버깅 정보 없이 답변 본문만 전송한다.
+    """
+    logger = get_logger(__name__)
+    logger.info(f"새로운 스트리밍 채팅 요청 - 질문: {request.query[:100]}{'...' if len(request.query) > 100 else ''}")
+    
+    # 스트림 시작 전에 인증을 끝내야 401을 정상적으로 반환할 수 있음
+    authenticate_request(request)
+    
+    transformed_char_info = transform_character_data(request.characterData)
+    conversation_history = build_conversation_history(request)
+    
+    answer_stream = astream_structured_rag_answer(
+        request.query,
+        character_info=transformed_char_info,
+        conversation_history=conversation_history
+    )
+    return StreamingResponse(answer_stream, media_type="text/plain; charset=utf-8")
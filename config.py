@@ -2,6 +2,7 @@
 6-AI 프로젝트 설정 관리
 환경변수 기반 중앙화된 설정 시스템
 """
+import importlib.util
 import os
 from pathlib import Path
 from dotenv import load_dotenv
@@ -43,6 +44,17 @@ class Config:
     EMBEDDING_TYPE: str = os.getenv("EMBEDDING_TYPE", "openai")
     CROSS_ENCODER_MODEL: str = os.getenv("CROSS_ENCODER_MODEL", "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1")
     LLM_MODEL_NAME: str = os.getenv("LLM_MODEL_NAME", "gemini-2.5-pro-preview-05-06")
+    # 하이브리드 검색 점수 융합 (dbsf | rrf) 및 BM25 기본 가중치 (벡터 = 1 - BM25)
+    FUSION_METHOD: str = os.getenv("FUSION_METHOD", "dbsf")
+    HYBRID_BM25_WEIGHT: float = float(os.getenv("HYBRID_BM25_WEIGHT", "0.7"))
+    # bm25s 점수 계산 백엔드 (auto | numba | numpy) - auto는 numba 설치 시 JIT 커널 사용
+    BM25_BACKEND: str = os.getenv("BM25_BACKEND", "auto")
+    # 검색기별(벡터, BM25) 후보 수와 지연시간 기반 자동 축소
+    # 최근 SEARCH_LATENCY_WINDOW회 검색의 p95가 SEARCH_LATENCY_BUDGET(초)를 넘으면 SEARCH_K_REDUCED 사용 (0이면 비활성)
+    SEARCH_K: int = int(os.getenv("SEARCH_K", "25"))
+    SEARCH_K_REDUCED: int = int(os.getenv("SEARCH_K_REDUCED", "12"))
+    SEARCH_LATENCY_BUDGET: float = float(os.getenv("SEARCH_LATENCY_BUDGET", "3.0"))
+    SEARCH_LATENCY_WINDOW: int = int(os.getenv("SEARCH_LATENCY_WINDOW", "20"))
     
     # ================================
     # 💾 데이터베이스 설정
@@ -55,6 +67,9 @@ class Config:
     VECTORDB_CACHE_PATH: str = os.getenv(
         "VECTORDB_CACHE_PATH", "vector_db/vectordb_cache.json"
     )
+    VECTOR_INDEX_PATH: str = os.getenv(
+        "VECTOR_INDEX_PATH", "vector_db/hnsw.faiss"
+    )  # faiss 설치 시 사용하는 HNSW 인덱스
     JOB_EMBEDDINGS_PATH: str = os.getenv(
         "JOB_EMBEDDINGS_PATH", "vector_db/job_embeddings.json"
     )
@@ -62,6 +77,8 @@ class Config:
         "JOB_NAMES_PATH", "job_names.json"
     )
     EMBED_BATCH_SIZE: int = int(os.getenv("EMBED_BATCH_SIZE", "200"))
+    # 동시에 요청하는 임베딩 배치 수 (API 속도 제한에 맞춰 조정)
+    EMBED_CONCURRENCY: int = int(os.getenv("EMBED_CONCURRENCY", "5"))
     JOB_SIMILARITY_THRESHOLD: float = float(
         os.getenv("JOB_SIMILARITY_THRESHOLD", "0.75")
     )
@@ -126,8 +143,18 @@ class Config:
     PROCESSED_CACHE_PATH: str = os.getenv(
         "PROCESSED_CACHE_PATH", "data/processed/processed_cache.json"
     )
+    PROCESSED_DEDUP_PATH: str = os.getenv(
+        "PROCESSED_DEDUP_PATH", "data/processed/content_hashes.txt"
+    )
+    KIWI_CACHE_PATH: str = os.getenv(
+        "KIWI_CACHE_PATH", "data/processed/kiwi_cache.db"
+    )
     CHUNK_SIZE: int = int(os.getenv("CHUNK_SIZE", "1200"))
     CHUNK_OVERLAP: int = int(os.getenv("CHUNK_OVERLAP", "150"))
+    # 문장 분리 워커 프로세스 수 (1이면 메인 프로세스에서 Kiwi 배치 처리)
+    PREPROCESS_WORKERS: int = int(os.getenv("PREPROCESS_WORKERS", "1"))
+    # 문서 ID 해시 (md5 | xxh3) — 바꾸면 기존 ID와 달라지므로 --force로 전체 재생성 필요
+    DOC_ID_HASH: str = os.getenv("DOC_ID_HASH", "md5")
 
     # ================================
     # 🕷️ 파이프라인 설정
@@ -141,7 +168,33 @@ class Config:
     # ================================
     CACHE_EXPIRY_SHORT: int = int(os.getenv("CACHE_EXPIRY_SHORT", "43200"))  # 12시간
     CACHE_EXPIRY_LONG: int = int(os.getenv("CACHE_EXPIRY_LONG", "86400"))    # 24시간
+    # 의미 캐시 (표현만 다른 같은 질문의 검색 결과 재사용, 거리 = SimHash 해밍 거리 비율)
+    # 다른 질문의 결과를 돌려줄 수 있고 결과 전체를 메모리에 들고 있으므로 명시적으로 켤 때만 사용
+    SEMANTIC_CACHE_ENABLED: bool = os.getenv("SEMANTIC_CACHE_ENABLED", "false").lower() == "true"
+    SEMANTIC_CACHE_MAX_ENTRIES: int = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "10000"))
+    SEMANTIC_CACHE_MAX_DISTANCE: float = float(os.getenv("SEMANTIC_CACHE_MAX_DISTANCE", "0.1"))
+    # 쿼리 임베딩 메모리 캐시 크기 (같은 쿼리의 임베딩 API 재호출 방지)
+    QUERY_EMBEDDING_CACHE_SIZE: int = int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "1024"))
     DEVICE: str = os.getenv("DEVICE", "auto")
+    # 재랭킹 배치 크기 (0이면 후보 전체를 한 번의 forward로 처리)
+    CROSS_ENCODER_BATCH_SIZE: int = int(os.getenv("CROSS_ENCODER_BATCH_SIZE", "0"))
+    # (쿼리, 문서) 쌍 최대 토큰 길이 - 짧을수록 어텐션 연산량이 제곱으로 감소
+    CROSS_ENCODER_MAX_LENGTH: int = int(os.getenv("CROSS_ENCODER_MAX_LENGTH", "256"))
+    # CPU 추론 시 torch 스레드 수 (0이면 torch 기본값, 다중 워커면 1 권장)
+    CROSS_ENCODER_CPU_THREADS: int = int(os.getenv("CROSS_ENCODER_CPU_THREADS", "0"))
+    # CrossEncoder 백엔드 (torch | onnx) - onnx는 CPU에서 int8 양자화 모델 사용
+    CROSS_ENCODER_BACKEND: str = os.getenv("CROSS_ENCODER_BACKEND", "torch")
+    # torch 백엔드 CPU 추론 시 bf16 사용 (AVX512-BF16/AMX 지원 CPU에서만 적용, 그 외는 fp32)
+    CROSS_ENCODER_CPU_BF16: bool = os.getenv("CROSS_ENCODER_CPU_BF16", "true").lower() == "true"
+    # FAISS HNSW 벡터 저장 형식 (flat | fp16 | 8bit) - fp16/8bit는 스칼라 양자화로 메모리 대역폭 절감
+    VECTOR_INDEX_QUANTIZER: str = os.getenv("VECTOR_INDEX_QUANTIZER", "fp16")
+    # 벡터 검색 시 쿼리에 나온 직업(+ 미분류) 문서로 후보 범위 제한 (부족하면 전체 탐색)
+    VECTOR_CLASS_FILTER: bool = os.getenv("VECTOR_CLASS_FILTER", "true").lower() == "true"
+    # 벡터 후보 선택 방식 (similarity | mmr) - 하이브리드 융합과 CrossEncoder 재랭킹이 뒤따르므로 기본은 유사도 순
+    VECTOR_SEARCH_TYPE: str = os.getenv("VECTOR_SEARCH_TYPE", "similarity")
+    # Gemini/OpenAI API 연결 풀 (keep-alive 유지 시간 동안 TLS 연결 재사용)
+    LLM_HTTP_MAX_CONNECTIONS: int = int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "10"))
+    LLM_HTTP_KEEPALIVE_SECONDS: float = float(os.getenv("LLM_HTTP_KEEPALIVE_SECONDS", "60"))
     
     # ================================
     # 🔒 보안 설정
@@ -231,6 +284,22 @@ class Config:
         """크롤러용 HTTP 헤더 반환"""
         return {"User-Agent": cls.CRAWLER_USER_AGENT}
     
+    @classmethod
+    def http_client_args(cls) -> dict:
+        """외부 API(Gemini, OpenAI) httpx 클라이언트 공통 설정
+
+        keep-alive 연결 풀을 유지하고, h2가 설치되어 있으면 HTTP/2로 한 연결에서 동시 요청을 처리한다.
+        """
+        import httpx
+        return {
+            "limits": httpx.Limits(
+                max_connections=cls.LLM_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=cls.LLM_HTTP_MAX_CONNECTIONS,
+                keepalive_expiry=cls.LLM_HTTP_KEEPALIVE_SECONDS,
+            ),
+            "http2": importlib.util.find_spec("h2") is not None,
+        }
+    
     @classmethod
     def create_embedding_function(cls):
         """임베딩 타입에 따라 적절한 임베딩 함수 생성"""
@@ -252,9 +321,14 @@ class Config:
             from langchain_openai import OpenAIEmbeddings
             if not cls.OPENAI_API_KEY:
                 raise ValueError("OpenAI API 키(OPENAI_API_KEY)가 설정되지 않았습니다.")
+            import httpx
+            # 쿼리마다 새 연결(TLS 핸드셰이크)을 맺지 않도록 연결 풀을 유지하는 클라이언트 사용
+            client_args = cls.http_client_args()
             return OpenAIEmbeddings(
                 model=cls.EMBED_MODEL_NAME,
-                openai_api_key=cls.OPENAI_API_KEY
+                openai_api_key=cls.OPENAI_API_KEY,
+                http_client=httpx.Client(**client_args),
+                http_async_client=httpx.AsyncClient(**client_args),
             )
         else:
             raise ValueError(f"지원하지 않는 임베딩 타입: {cls.EMBEDDING_TYPE}")
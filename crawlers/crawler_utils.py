@@ -8,9 +8,17 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).resolve().parent.parent))
 from config import config
 
+# Lexbor(C) 기반 HTML 파서 (미설치 시 BeautifulSoup으로 대체)
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+except ImportError:
+    HTMLParser = None
+
 # 로깅 설정
 logger = logging.getLogger("crawler")
 
+_WS_RE = re.compile(r'\s+')
+
 
 # ────────────────── 텍스트 처리 유틸 ──────────────────
 def clean_text(text):
@@ -20,10 +28,15 @@ def clean_text(text):
     
     # HTML 태그 제거
     if '<' in text and '>' in text:  # HTML로 보이는 경우만 처리
-        text = BeautifulSoup(text, "html.parser").get_text(separator=" ")
+        if HTMLParser is not None:
+            tree = HTMLParser(text)
+            tree.strip_tags(["script", "style", "template"])  # BeautifulSoup.get_text와 동일하게 제외
+            text = tree.text(separator=" ")
+        else:
+            text = BeautifulSoup(text, "html.parser").get_text(separator=" ")
     
     # 연속 공백 제거
-    text = re.sub(r'\s+', ' ', text)
+    text = _WS_RE.sub(' ', text)
     
     # 줄바꿈 표준화
     text = text.replace('\r\n', '\n').replace('\r', '\n')
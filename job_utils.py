@@ -14,3 +14,9 @@ def find_job_in_text(text: str) -> str | None:
         if lower_job in text_lower:
             return JOB_NAMES[lower_job]
     return None
+
+
+def find_jobs_in_text(text: str) -> list[str]:
+    """문자열에 등장하는 모든 직업명을 원본 표기로 돌려준다(없으면 빈 리스트)."""
+    text_lower = text.lower()
+    return [original for lower_job, original in JOB_NAMES.items() if lower_job in text_lower]
@@ -1,18 +1,43 @@
 from __future__ import annotations
 
+import asyncio
+import html
 import json
 import logging
+import mmap
+import multiprocessing as mp
+import os
 import re
+import sqlite3
 import sys
 import hashlib
+import unicodedata
+from collections import defaultdict
 from pathlib import Path
 sys.path.append(str(Path(__file__).resolve().parent.parent))
 from config import config
-from typing import Any, Dict, List, Set
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple, Union
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
 
+import orjson
 from kiwipiepy import Kiwi
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+# 변경 감지용 고속 해시 (설치되어 있지 않으면 hashlib.md5로 대체)
+try:
+    from blake3 import blake3
+except ImportError:
+    blake3 = None
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+# 약어 치환용 Aho-Corasick 자동자 (없으면 정규식 치환으로 대체)
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
 
 # ─────────────────────────────────────────────────────────────
 # 1️⃣ 설정
@@ -20,8 +45,17 @@ MERGED_DIR           = Path(config.MERGED_DIR)
 RAW_DIR              = Path(config.RAW_DIR)
 PROCESSED_SAVE_PATH  = Path(config.PROCESSED_SAVE_PATH)
 PROCESSED_CACHE_PATH = Path(config.PROCESSED_CACHE_PATH)
+PROCESSED_DEDUP_PATH = Path(config.PROCESSED_DEDUP_PATH)
+KIWI_CACHE_PATH      = Path(config.KIWI_CACHE_PATH)
 CHUNK_SIZE           = config.CHUNK_SIZE
 CHUNK_OVERLAP        = config.CHUNK_OVERLAP
+DOC_ID_HASH          = config.DOC_ID_HASH.lower()
+KIWI_WORKERS         = os.cpu_count() or 1  # Kiwi 내부 스레드 수 (배치 분석 시 사용)
+PREPROCESS_WORKERS   = config.PREPROCESS_WORKERS  # 문장 분리 워커 프로세스 수
+KIWI_BATCH_SIZE      = 256  # 한 번에 Kiwi로 넘길 문서 수
+WRITE_BATCH_SIZE     = 4096  # 한 번에 파일로 내보낼 청크 레코드 수
+HASH_WORKERS         = 16  # 파일 해시 계산 스레드 수 (디스크 경합 방지를 위해 작게 유지)
+PROCESS_HASH_MIN_FILES = 256  # 해시할 파일이 이 이상이면 프로세스 풀 사용
 
 # 약어 → 정식 용어 매핑
 DNF_TERMS = {
@@ -41,19 +75,63 @@ log = logging.getLogger("preprocess")
 # ─────────────────────────────────────────────────────────────
 # 2️⃣ 증분 처리 도구
 
-def get_file_hash(file_path: Path) -> str:
-    """파일의 MD5 해시 계산"""
-    hasher = hashlib.md5()
+def iter_files(root: Path, suffixes: Optional[Tuple[str, ...]] = None) -> Iterator[os.DirEntry]:
+    """os.scandir 기반 재귀 탐색 (DirEntry 캐시로 파일마다 stat 호출 방지)
+
+    suffixes가 주어지면 소문자 파일명 끝이 일치하는 파일만 반환한다.
+    DirEntry를 그대로 넘겨 호출 측이 entry.stat()/entry.path(str)를 쓰도록 한다.
+    """
+    stack = [str(root)]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file() and (
+                        suffixes is None or entry.name.lower().endswith(suffixes)
+                    ):
+                        yield entry
+        except OSError as e:
+            log.warning(f"디렉토리 탐색 실패: {current} ({e})")
+
+# 현재 환경의 변경 감지 해시 알고리즘 (캐시 항목마다 함께 저장해 설치 패키지가 바뀌어도 비교 가능)
+FILE_HASH_ALGORITHM = "blake3" if blake3 is not None else ("xxh3_128" if xxhash is not None else "blake2b")
+# 알고리즘 정보가 없는 최초 형식 캐시(해시 문자열 / [mtime_ns, size, hash])는 MD5로 기록됨
+LEGACY_FILE_HASH_ALGORITHM = "md5"
+
+_HASHLIB_FACTORIES = {
+    "blake2b": lambda: hashlib.blake2b(digest_size=32),
+    "md5": hashlib.md5,
+}
+
+def get_file_hash(file_path: Union[str, Path], algorithm: str = FILE_HASH_ALGORITHM) -> str:
+    """파일 내용 해시 계산 (변경 감지 전용: BLAKE3 > xxHash3 > BLAKE2b, 이전 캐시 비교용 MD5)
+
+    프로세스 풀로 넘길 때는 문자열 경로로 전달된다. 해당 알고리즘을 쓸 수 없으면 빈 문자열.
+    """
+    file_path = Path(file_path)
     try:
+        if algorithm == "blake3":
+            hasher = blake3()
+            hasher.update_mmap(str(file_path))
+            return hasher.hexdigest()
+        if algorithm == "xxh3_128":
+            return xxhash.xxh3_128_hexdigest(file_path.read_bytes())
+        factory = _HASHLIB_FACTORIES[algorithm]
         with file_path.open('rb') as f:
-            for chunk in iter(lambda: f.read(4096), b""):
+            if hasattr(hashlib, "file_digest"):  # Python 3.11+: C 루프에서 GIL 해제 후 읽기
+                return hashlib.file_digest(f, factory).hexdigest()
+            hasher = factory()
+            for chunk in iter(lambda: f.read(1 << 20), b""):
                 hasher.update(chunk)
-        return hasher.hexdigest()
+            return hasher.hexdigest()
     except Exception:
         return ""
 
-def load_processed_cache() -> Dict[str, str]:
-    """처리된 파일 캐시 로드 (file_path -> file_hash)"""
+def load_processed_cache() -> Dict[str, Any]:
+    """처리된 파일 캐시 로드 (file_path -> {"size", "mtime_ns", "hash", "algo"})"""
     try:
         if PROCESSED_CACHE_PATH.exists():
             with PROCESSED_CACHE_PATH.open('r', encoding='utf-8') as f:
@@ -62,7 +140,7 @@ def load_processed_cache() -> Dict[str, str]:
         log.warning(f"캐시 로드 실패: {e}")
     return {}
 
-def save_processed_cache(cache: Dict[str, str]) -> None:
+def save_processed_cache(cache: Dict[str, Any]) -> None:
     """처리된 파일 캐시 저장"""
     try:
         PROCESSED_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
@@ -71,9 +149,40 @@ def save_processed_cache(cache: Dict[str, str]) -> None:
     except Exception as e:
         log.warning(f"캐시 저장 실패: {e}")
 
-def get_new_and_updated_files(processed_cache: Dict[str, str]) -> List[Path]:
-    """새로운 파일과 업데이트된 파일 탐지"""
+def _cached_entry(cached: Any) -> Dict[str, Any]:
+    """이전 형식 캐시 항목을 {"size", "mtime_ns", "hash", "algo"} 형태로 변환
+
+    - 해시 문자열(최초 형식): stat 정보가 없으므로 MD5 해시 비교로만 판정
+    - [mtime_ns, size, hash] 리스트 (MD5)
+    - algo가 없는 dict: 당시 환경의 알고리즘을 알 수 없으므로 현재 알고리즘으로 간주
+    """
+    if isinstance(cached, dict):
+        return cached if "algo" in cached else {**cached, "algo": FILE_HASH_ALGORITHM}
+    if isinstance(cached, list) and len(cached) == 3:
+        return {"size": cached[1], "mtime_ns": cached[0], "hash": cached[2], "algo": LEGACY_FILE_HASH_ALGORITHM}
+    if isinstance(cached, str):
+        return {"hash": cached, "algo": LEGACY_FILE_HASH_ALGORITHM}
+    return {}
+
+
+def _hash_for_compare(args: Tuple[str, Optional[str]]) -> Tuple[str, Optional[str]]:
+    """(경로, 캐시 알고리즘) → (현재 알고리즘 해시, 캐시 알고리즘이 다르면 그 알고리즘 해시)"""
+    path, cached_algo = args
+    current = get_file_hash(path)
+    if cached_algo is None or cached_algo == FILE_HASH_ALGORITHM:
+        return current, None
+    return current, get_file_hash(path, cached_algo)
+
+def get_new_and_updated_files(processed_cache: Dict[str, Any]) -> List[Tuple[Path, str]]:
+    """새로운 파일과 업데이트된 파일 탐지 → [(경로, 파일 출처 "merged/…")]
+
+    (size, mtime_ns)가 캐시와 같으면 파일을 읽지 않고 변경 없음으로 간주한다.
+    둘 중 하나라도 다를 때만 해시를 계산해 실제 내용 변경 여부를 확인한다.
+    캐시 항목의 해시 알고리즘이 현재와 다르면(이전 MD5 캐시, 해시 패키지 설치/제거)
+    그 알고리즘으로 한 번 더 계산해 비교하고, 현재 알고리즘 해시로 갱신한다.
+    """
     new_files = []
+    candidates = []  # (path, 캐시 키, stat, 캐시 항목)
     
     # MERGED_DIR만 검사 (RAW_DIR 제외하여 중복 방지)
     search_dirs = [MERGED_DIR]
@@ -82,46 +191,107 @@ def get_new_and_updated_files(processed_cache: Dict[str, str]) -> List[Path]:
         if not search_dir.exists():
             continue
             
-        for path in search_dir.rglob("*"):
-            if not path.is_file():
-                continue
-            if path.suffix.lower() not in {".json", ".jsonl"}:
-                continue
-                
-            # 상대 경로를 계산할 때 어느 디렉토리에서 온 파일인지 구분
-            try:
-                if search_dir == MERGED_DIR:
-                    file_path_str = f"merged/{path.relative_to(MERGED_DIR)}"
-                else:
-                    file_path_str = f"raw/{path.relative_to(RAW_DIR)}"
-            except ValueError:
+        # 상대 경로를 계산할 때 어느 디렉토리에서 온 파일인지 구분 (Path 변환 없이 문자열로)
+        source = "merged" if search_dir == MERGED_DIR else "raw"
+        root_prefix_len = len(str(search_dir)) + len(os.sep)
+            
+        for entry in iter_files(search_dir, (".json", ".jsonl")):
+            file_path_str = f"{source}/{entry.path[root_prefix_len:]}"
+            
+            st = entry.stat()
+            cached = _cached_entry(processed_cache.get(file_path_str))
+            
+            if cached.get("size") == st.st_size and cached.get("mtime_ns") == st.st_mtime_ns:
+                if cached is not processed_cache[file_path_str]:
+                    processed_cache[file_path_str] = cached  # 이전 형식 항목은 새 형식으로 이전
                 continue
-                
-            current_hash = get_file_hash(path)
             
-            # 새 파일이거나 해시가 변경된 경우
-            if file_path_str not in processed_cache or processed_cache[file_path_str] != current_hash:
-                new_files.append(path)
-                processed_cache[file_path_str] = current_hash
+            candidates.append((Path(entry.path), file_path_str, st, cached))
+    
+    if not candidates:
+        return new_files
+    
+    # 후보가 많으면 프로세스로 코어 수만큼 분산, 적으면 프로세스 기동 비용이 더 크므로 스레드 사용
+    jobs = [(str(c[0]), c[3].get("algo") if c[3].get("hash") else None) for c in candidates]
+    if len(jobs) >= PROCESS_HASH_MIN_FILES:
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+            hashes = list(executor.map(_hash_for_compare, jobs, chunksize=16))
+    else:
+        with ThreadPoolExecutor(max_workers=min(HASH_WORKERS, len(jobs))) as executor:
+            hashes = list(executor.map(_hash_for_compare, jobs))
+    
+    for (path, file_path_str, st, cached), (current_hash, cached_algo_hash) in zip(candidates, hashes):
+        compare_hash = cached_algo_hash if cached_algo_hash is not None else current_hash
+        # 새 파일이거나 해시가 변경된 경우
+        if not compare_hash or cached.get("hash") != compare_hash:
+            new_files.append((path, file_path_str))
+        processed_cache[file_path_str] = {
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "hash": current_hash,
+            "algo": FILE_HASH_ALGORITHM,
+        }
     
     return new_files
 
+def content_fingerprint(text: str) -> str:
+    """정규화된 본문의 지문 (동일 내용 문서 중복 제거용)"""
+    data = text.encode("utf-8")
+    if blake3 is not None:
+        return blake3(data).hexdigest()
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+def load_seen_hashes() -> Set[str]:
+    """이전 실행까지 처리한 본문 지문 로드 (한 줄에 하나)"""
+    try:
+        if PROCESSED_DEDUP_PATH.exists():
+            with PROCESSED_DEDUP_PATH.open('r', encoding='utf-8') as f:
+                return {line.strip() for line in f if line.strip()}
+    except Exception as e:
+        log.warning(f"본문 지문 로드 실패: {e}")
+    return set()
+
+def save_seen_hashes(new_hashes: List[str], append: bool) -> None:
+    """이번 실행에서 새로 본 본문 지문 저장 (증분 모드는 이어쓰기)"""
+    try:
+        PROCESSED_DEDUP_PATH.parent.mkdir(parents=True, exist_ok=True)
+        with PROCESSED_DEDUP_PATH.open('a' if append else 'w', encoding='utf-8') as f:
+            f.writelines(f"{h}\n" for h in new_hashes)
+    except Exception as e:
+        log.warning(f"본문 지문 저장 실패: {e}")
+
 def load_existing_processed_docs() -> Set[str]:
     """기존 처리된 문서 ID 집합 로드"""
     existing_ids = set()
     try:
         if PROCESSED_SAVE_PATH.exists():
-            with PROCESSED_SAVE_PATH.open('r', encoding='utf-8') as f:
+            with PROCESSED_SAVE_PATH.open('rb') as f:
                 for line in f:
                     if line.strip():
-                        data = json.loads(line)
+                        data = orjson.loads(line)
                         existing_ids.add(data.get('id', ''))
     except Exception as e:
         log.warning(f"기존 문서 로드 실패: {e}")
     return existing_ids
 
-def generate_document_id(doc: Dict[str, Any], chunk_index: int = 0) -> str:
-    """문서의 고유한 특성을 기반으로 안전한 ID 생성"""
+if DOC_ID_HASH == "xxh3" and xxhash is None:
+    log.warning("DOC_ID_HASH=xxh3 이지만 xxhash가 설치되어 있지 않아 md5로 ID를 생성합니다")
+
+def _id_digest(combined: str) -> str:
+    """문서 ID용 12자리 해시 (DOC_ID_HASH 설정에 따름)"""
+    if DOC_ID_HASH == "xxh3" and xxhash is not None:
+        return xxhash.xxh3_64_hexdigest(combined.encode('utf-8'))[:12]
+    return hashlib.md5(combined.encode('utf-8')).hexdigest()[:12]
+
+def generate_document_id(
+    doc: Dict[str, Any],
+    chunk_index: int = 0,
+    content_preview: Optional[str] = None,
+) -> str:
+    """문서의 고유한 특성을 기반으로 안전한 ID 생성
+
+    content_preview(id_content_preview(본문))를 넘기면 HTML 정리를 다시 하지 않는다.
+    """
     # 고유 식별자 생성을 위한 요소들
     id_components = []
     
@@ -137,7 +307,8 @@ def generate_document_id(doc: Dict[str, Any], chunk_index: int = 0) -> str:
     # 3. 내용 일부 사용 (첫 100자)
     content = doc.get('body', '') or doc.get('content', '')
     if content:
-        content_preview = clean_html(content)[:100]
+        if content_preview is None:
+            content_preview = id_content_preview(content)
         id_components.append(content_preview)
     
     # 4. 파일 소스 정보
@@ -151,59 +322,406 @@ def generate_document_id(doc: Dict[str, Any], chunk_index: int = 0) -> str:
         id_components.append(str(doc['timestamp']))
     
     # 조합된 문자열을 해시화
+    # (기본은 MD5: ID가 바뀌면 기존 processed_docs/벡터DB와 증분 중복 판정이 모두 어긋남.
+    #  새로 구축하는 경우 DOC_ID_HASH=xxh3로 더 빠른 비암호 해시 사용 가능)
     combined = '|'.join(id_components)
-    doc_hash = hashlib.md5(combined.encode('utf-8')).hexdigest()[:12]  # 12자리로 축약
+    doc_hash = _id_digest(combined)  # 12자리로 축약
     
     # 청크 인덱스와 조합하여 최종 ID 생성
     return f"doc_{doc_hash}_chunk_{chunk_index}"
 
+# 원본 ID → 마지막으로 부여한 dup 번호 (충돌마다 1부터 다시 세지 않도록)
+_DUP_COUNTER: Dict[str, int] = defaultdict(int)
+
 def check_id_uniqueness(doc_id: str, existing_ids: Set[str]) -> str:
     """ID 중복 검사 및 고유 ID 보장"""
+    if doc_id not in existing_ids:
+        return doc_id
+    
+    # 중복이면 suffix 추가 (분리는 한 번만)
     original_id = doc_id
-    counter = 1
+    if "_chunk_" in original_id:
+        base_part, chunk_part = original_id.rsplit('_chunk_', 1)
+        template = f"{base_part}_dup{{}}_chunk_{chunk_part}"
+    else:
+        template = f"{original_id}_dup{{}}"
     
+    counter = _DUP_COUNTER[original_id] + 1
+    doc_id = template.format(counter)
     while doc_id in existing_ids:
-        # 중복이면 suffix 추가
-        if "_chunk_" in original_id:
-            base_part, chunk_part = original_id.rsplit('_chunk_', 1)
-            doc_id = f"{base_part}_dup{counter}_chunk_{chunk_part}"
-        else:
-            doc_id = f"{original_id}_dup{counter}"
         counter += 1
+        doc_id = template.format(counter)
+    _DUP_COUNTER[original_id] = counter
     
     return doc_id
 
 # ─────────────────────────────────────────────────────────────
 # 3️⃣ 헬퍼
-kiwi = Kiwi()
+_kiwi = None
 
-RE_HTML_TAG = re.compile(r"<[^>]*>")        # very naive stripper
+
+def get_kiwi() -> Kiwi:
+    """Kiwi 지연 생성 (새 파일이 없는 증분 실행이나 워커를 쓰는 메인 프로세스는 모델을 올리지 않음)"""
+    global _kiwi
+    if _kiwi is None:
+        _kiwi = Kiwi(num_workers=KIWI_WORKERS)
+    return _kiwi
+
+_HTML_TAG = r"<[^>]*>"
+RE_HTML_TAG = re.compile(_HTML_TAG)        # very naive stripper
+RE_WS = re.compile(r"\s+")
+
+
+def _unescape_entities(text: str) -> str:
+    """HTML 엔티티(&amp; &lt; &nbsp; …)를 문자로 복원 (엔티티가 없으면 그대로)"""
+    return html.unescape(text) if "&" in text else text
 
 
 def clean_html(text: str) -> str:
-    """태그 제거 + 라인 정리"""
-    text = RE_HTML_TAG.sub("", text)
-    text = re.sub(r"\s+", " ", text).strip()
-    return text
+    """태그 제거 + 엔티티 복원 + 라인 정리"""
+    return RE_WS.sub(" ", _unescape_entities(RE_HTML_TAG.sub("", text))).strip()
+
+
+def id_content_preview(text: str) -> str:
+    """문서 ID용 본문 미리보기 (첫 100자)
+
+    기존 문서 ID가 바뀌지 않도록 태그 제거 + 공백 정리만 하고 엔티티는 원문 그대로 둔다.
+    """
+    return RE_WS.sub(" ", RE_HTML_TAG.sub("", text)).strip()[:100]
+
+
+# 소문자 키 → 정식 용어 (모듈 로드 시 1회 구성)
+_ABBR_MAP = {k.lower(): v for k, v in {**DNF_TERMS, **DNF_CLASSES}.items()}
+
+# 모든 약어를 하나로 묶은 정규식 (긴 키 우선, 사전이 비었으면 None)
+_ABBR_PATTERN = (
+    r"\b(" + "|".join(map(re.escape, sorted(_ABBR_MAP, key=len, reverse=True))) + r")\b"
+    if _ABBR_MAP else None
+)
+_ABBR_RE = re.compile(_ABBR_PATTERN, re.IGNORECASE) if _ABBR_PATTERN else None
+
+
+def _abbr_replace(m: re.Match) -> str:
+    # 유니코드 대소문자 폴딩 차이로 키가 없을 수 있으므로 원문 유지
+    return _ABBR_MAP.get(m.group(1).lower(), m.group(1))
+
+
+def _build_abbr_automaton():
+    """약어 사전을 Aho-Corasick 자동자로 컴파일 (사전이 비었거나 모듈이 없으면 None)"""
+    if ahocorasick is None or not _ABBR_MAP:
+        return None
+    automaton = ahocorasick.Automaton()
+    for key, value in _ABBR_MAP.items():
+        automaton.add_word(key, (len(key), value))
+    automaton.make_automaton()
+    return automaton
+
+
+_ABBR_AUTOMATON = _build_abbr_automaton()
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+def _at_word_boundary(text: str, idx: int) -> bool:
+    """정규식 \\b와 같은 의미의 단어 경계 판정"""
+    left = idx > 0 and _is_word_char(text[idx - 1])
+    right = idx < len(text) and _is_word_char(text[idx])
+    return left != right
 
 
 def normalize_abbr(text: str) -> str:
     """DNF 약어/직업명 통일"""
-    for k, v in {**DNF_TERMS, **DNF_CLASSES}.items():
-        text = re.sub(rf"\b{re.escape(k)}\b", v, text, flags=re.IGNORECASE)
-    return text
+    lowered = text.lower()
+    if _ABBR_AUTOMATON is None or len(lowered) != len(text):
+        return _ABBR_RE.sub(_abbr_replace, text)
+
+    # 한 번의 선형 탐색으로 모든 후보를 찾고, 가장 왼쪽·가장 긴 매칭부터 채택
+    matches = []
+    at_boundary = _at_word_boundary  # 루프 안 전역 조회를 지역 변수로
+    append = matches.append
+    for end, (length, value) in _ABBR_AUTOMATON.iter(lowered):
+        start = end - length + 1
+        if at_boundary(text, start) and at_boundary(text, end + 1):
+            append((start, -length, value))
+    if not matches:
+        return text
+
+    matches.sort()
+    pieces = []
+    pos = 0
+    for start, neg_length, value in matches:
+        if start < pos:
+            continue
+        pieces.append(text[pos:start])
+        pieces.append(value)
+        pos = start - neg_length
+    pieces.append(text[pos:])
+    return "".join(pieces)
+
+
+if not _ABBR_MAP:
+    # 사전이 비어 있으면(기본 설정) 문서마다 스캔할 필요 없이 그대로 반환
+    def normalize_abbr(text: str) -> str:  # noqa: F811
+        """DNF 약어/직업명 통일 (사전이 비어 있어 항등 함수)"""
+        return text
+
+
+def _build_clean_pattern() -> re.Pattern:
+    """태그 제거 + 공백 정리 + 약어 치환을 한 번에 수행하는 결합 패턴"""
+    alternatives = [
+        rf"(?:{_HTML_TAG})*(\s)(?:\s|{_HTML_TAG})*",  # 공백이 포함된 태그/공백 연속 구간 → " "
+        _HTML_TAG,                                   # 공백 없는 태그 → ""
+    ]
+    if _ABBR_PATTERN:
+        alternatives.append(_ABBR_PATTERN)
+    return re.compile("|".join(alternatives), re.IGNORECASE)
+
+
+RE_CLEAN = _build_clean_pattern()
+
+
+def _clean_replace(m: re.Match) -> str:
+    if m.lastindex == 1:
+        return " "
+    if m.lastindex == 2:
+        return _ABBR_MAP.get(m.group(2).lower(), m.group(2))
+    return ""
+
+
+def clean_and_normalize(text: str) -> str:
+    """clean_html + normalize_abbr를 단일 정규식 패스로 처리 (본문용)
+
+    엔티티가 있는 본문만 복원 후 공백(&nbsp; 등)을 한 번 더 정리한다.
+    """
+    cleaned = RE_CLEAN.sub(_clean_replace, text)
+    if "&" in cleaned:
+        cleaned = RE_WS.sub(" ", html.unescape(cleaned))
+    return cleaned.strip()
+
+
+_SENT_RE = re.compile(r"(?<=[.!?。！？])\s+|\n+")
+_SENT_END_RE = re.compile(r"[.!?。！？]")
+_FAST_SENT_MAX_LEN = 300  # 빠른 분리 결과 중 이보다 긴 문장이 있으면 Kiwi로 다시 분리
+
+
+def _looks_well_spaced(text: str) -> bool:
+    """띄어쓰기와 문장부호가 충분한 (Kiwi 없이 나눠도 되는) 텍스트인지 판단"""
+    return (
+        len(text) > 0
+        and text.count(" ") / len(text) > 0.08
+        and _SENT_END_RE.search(text) is not None
+    )
+
+
+def _fast_split(text: str) -> Optional[List[str]]:
+    """정규식으로 충분한 텍스트는 Kiwi 없이 문장 분리 (Kiwi가 필요하면 None)
+
+    - 청크 하나에 들어가는 짧은 텍스트: 문장 경계는 청크 안 줄바꿈 위치에만 영향
+    - 띄어쓰기/문장부호가 정상인 텍스트
+    """
+    if len(text) <= CHUNK_SIZE:
+        return [s for s in _SENT_RE.split(text) if s]
+    if _looks_well_spaced(text):
+        sents = [s for s in _SENT_RE.split(text) if s]
+        if all(len(s) <= _FAST_SENT_MAX_LEN for s in sents):
+            return sents
+    return None
 
 
 def sent_tokenize(text: str) -> List[str]:
-    """Korean sentence splitter (Kiwi)"""
-    spans = kiwi.split_into_sents(text)
+    """Korean sentence splitter (띄어쓰기가 정상인 텍스트는 정규식, 나머지는 Kiwi)"""
+    sents = _fast_split(text)
+    if sents is not None:
+        return sents
+    spans = get_kiwi().split_into_sents(text)
     return [s.text for s in spans]
 
 
-def load_raw_files(incremental: bool = False) -> List[Dict[str, Any]]:
-    """로 파일 로드 (증분 처리 지원)"""
-    docs: List[Dict[str, Any]] = []
-    
+def sent_tokenize_batch(texts: List[str]) -> List[List[str]]:
+    """여러 텍스트를 한 번의 Kiwi 호출로 문장 분리 (입력 순서 유지)"""
+    results: List[Optional[List[str]]] = [_fast_split(t) for t in texts]
+    slow = [i for i, sents in enumerate(results) if sents is None]
+    if slow:
+        # 반복 가능한 입력을 넘기면 Kiwi가 내부 스레드 풀로 나눠 처리
+        for i, spans in zip(slow, get_kiwi().split_into_sents(texts[i] for i in slow)):
+            results[i] = [s.text for s in spans]
+    return results
+
+
+class SentenceCache:
+    """본문 지문 → Kiwi 문장 분리 결과를 저장하는 SQLite 캐시
+
+    Kiwi 분석은 입력이 같으면 결과도 같으므로, 재실행 시 바뀌지 않은 본문은
+    Kiwi를 다시 돌리지 않는다. 쓰기는 commit_every건마다 한 번씩 커밋한다.
+    정규식 분리 결과는 CHUNK_SIZE 등 설정에 따라 달라지므로 저장하지 않는다.
+    """
+
+    def __init__(self, db_path: Path, commit_every: int = 1000):
+        self.commit_every = commit_every
+        self._pending = 0
+        self.hits = 0
+        self.misses = 0
+        try:
+            db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(db_path))
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS kiwi_sents (h TEXT PRIMARY KEY, sents BLOB NOT NULL)"
+            )
+        except sqlite3.Error as e:
+            log.warning(f"Kiwi 캐시 열기 실패 (캐시 없이 진행): {e}")
+            self._conn = None
+
+    def get(self, key: str) -> Optional[List[str]]:
+        if self._conn is None:
+            return None
+        row = self._conn.execute("SELECT sents FROM kiwi_sents WHERE h = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return orjson.loads(row[0])
+
+    def put(self, key: str, sentences: List[str]) -> None:
+        if self._conn is None:
+            return
+        self._conn.execute(
+            "INSERT OR REPLACE INTO kiwi_sents (h, sents) VALUES (?, ?)",
+            (key, orjson.dumps(sentences)),
+        )
+        self._pending += 1
+        if self._pending >= self.commit_every:
+            self._conn.commit()
+            self._pending = 0
+
+    def close(self) -> None:
+        if self._conn is None:
+            return
+        self._conn.commit()
+        self._conn.close()
+        self._conn = None
+
+
+def pack_sentences(sentences: List[str], chunk_size: int, chunk_overlap: int) -> List[str]:
+    """Kiwi가 나눈 문장을 chunk_size 이내로 탐욕적으로 묶기
+
+    청크가 넘치면 직전 청크의 끝 문장들(합계 chunk_overlap 이내)을 다음 청크의
+    시작으로 이어 붙인다. chunk_size보다 긴 문장은 글자 단위로 잘라낸다.
+    """
+    def joined_len(parts: List[str]) -> int:
+        return sum(map(len, parts)) + len(parts) - 1 if parts else 0
+
+    chunks: List[str] = []
+    current: List[str] = []
+    cur_len = 0  # len("\n".join(current))
+
+    for sent in sentences:
+        sent = sent.strip()
+        if not sent:
+            continue
+
+        # 한 문장이 청크보다 길면 겹침을 두고 자르기 (가능하면 공백에서 끊기)
+        if len(sent) > chunk_size:
+            if current:
+                chunks.append("\n".join(current))
+                current, cur_len = [], 0
+            start, n = 0, len(sent)
+            while start < n:
+                end = min(start + chunk_size, n)
+                if end < n:
+                    # 청크 뒤쪽 절반 안의 마지막 공백에서 끊어 단어가 잘리지 않게 함
+                    cut = sent.rfind(" ", start + chunk_size // 2, end)
+                    if cut != -1:
+                        end = cut
+                piece = sent[start:end].strip()
+                if piece:
+                    chunks.append(piece)
+                if end >= n:
+                    break
+                # 겹침 구간도 단어 중간이 아닌 공백 다음부터 시작
+                # (겹침 안에 공백이 없으면 공백에서 끊은 경우 겹침 생략, 강제로 자른 경우 그대로)
+                overlap_start = end - chunk_overlap
+                space = sent.find(" ", overlap_start, end)
+                if space != -1:
+                    next_start = space + 1
+                elif sent[end] == " ":
+                    next_start = end + 1
+                else:
+                    next_start = overlap_start
+                start = max(next_start, start + 1)
+            continue
+
+        if current and cur_len + 1 + len(sent) > chunk_size:
+            chunks.append("\n".join(current))
+            # 끝 문장부터 chunk_overlap 이내로 겹침 시드 구성
+            seed: List[str] = []
+            for prev in reversed(current):
+                if joined_len([prev] + seed) > chunk_overlap:
+                    break
+                seed.insert(0, prev)
+            while seed and joined_len(seed) + 1 + len(sent) > chunk_size:
+                seed.pop(0)
+            current, cur_len = seed, joined_len(seed)
+
+        cur_len += len(sent) + (1 if current else 0)
+        current.append(sent)
+
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+def to_nfc(value: Any) -> Any:
+    """문자열(및 dict/list 내부 문자열 값)을 NFC로 정규화"""
+    if isinstance(value, str):
+        if unicodedata.is_normalized("NFC", value):
+            return value
+        return unicodedata.normalize("NFC", value)
+    if isinstance(value, dict):
+        return {k: to_nfc(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [to_nfc(v) for v in value]
+    return value
+
+
+_MMAP_MIN_SIZE = 64 << 20  # 이 크기 이상의 JSON 파일은 mmap으로 읽기
+
+
+def read_json_file(path: Path) -> Any:
+    """JSON 파일을 바이트 그대로 orjson으로 파싱 (대용량 파일은 mmap)"""
+    with path.open('rb') as f:
+        if os.fstat(f.fileno()).st_size < _MMAP_MIN_SIZE:
+            return orjson.loads(f.read())
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            view = memoryview(mm)
+            try:
+                return orjson.loads(view)
+            finally:
+                view.release()
+
+
+_PREFETCH_WINDOW = 64  # 한 번에 미리 읽을 파일 수 (동시에 열리는 파일 수 상한)
+
+
+def _read_small_file(path: Path) -> Optional[bytes]:
+    """mmap 대상이 아닌 파일의 바이트 읽기 (대용량 파일은 None → 파싱 시 mmap)"""
+    if path.stat().st_size >= _MMAP_MIN_SIZE:
+        return None
+    return path.read_bytes()
+
+
+async def _prefetch_files(paths: List[Path]) -> List[Optional[bytes]]:
+    """파일 읽기를 스레드로 넘겨 동시에 진행 (순서 유지)"""
+    return await asyncio.gather(*(asyncio.to_thread(_read_small_file, p) for p in paths))
+
+
+def list_raw_files(incremental: bool = False) -> List[Tuple[Path, str]]:
+    """처리할 로 파일 목록 수집 (증분 처리 지원) → [(경로, 파일 출처)]
+
+    파일 출처("merged/…" 또는 "raw/…")는 탐색한 디렉토리에서 바로 정해지므로
+    여기서 함께 넘겨 문서마다 다시 판정하지 않는다.
+    """
     if incremental:
         # 증분 모드: 새로운/업데이트된 파일만 처리
         processed_cache = load_processed_cache()
@@ -226,198 +744,313 @@ def load_raw_files(incremental: bool = False) -> List[Dict[str, Any]]:
         search_dirs = [MERGED_DIR]
         for search_dir in search_dirs:
             if search_dir.exists():
-                files_to_process.extend(list(search_dir.rglob("*")))
+                source = "merged" if search_dir == MERGED_DIR else "raw"
+                root_prefix_len = len(str(search_dir)) + len(os.sep)
+                files_to_process.extend(
+                    (Path(entry.path), f"{source}/{entry.path[root_prefix_len:]}")
+                    for entry in iter_files(search_dir)
+                )
         
-        files_to_process = [p for p in files_to_process if p.is_file()]
         log.info(f"📋 전체 모드: {len(files_to_process)}개 파일 처리 예정")
     
-    for path in files_to_process:
-        if path.suffix.lower() in {".json", ".jsonl"}:
-            with path.open(encoding="utf-8") as f:
+    return files_to_process
+
+
+def _iter_jsonl(path: Path, raw: Optional[bytes]) -> Iterator[Dict[str, Any]]:
+    """JSONL을 한 줄씩 orjson으로 파싱 (깨진 줄과 객체가 아닌 줄은 건너뜀)"""
+    if raw is not None:
+        lines = raw.splitlines()
+    else:
+        lines = path.open('rb')  # mmap 대상 크기의 파일은 스트리밍으로 읽기
+    try:
+        for lineno, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            try:
+                item = orjson.loads(line)
+            except orjson.JSONDecodeError:
+                log.warning("JSONL decode failed: %s:%d", path, lineno)
+                continue
+            if not isinstance(item, dict):
+                log.warning("JSONL line is not an object: %s:%d", path, lineno)
+                continue
+            yield item
+    finally:
+        if raw is None:
+            lines.close()
+
+
+def iter_raw_files(files_to_process: List[Tuple[Path, str]]) -> Iterator[Dict[str, Any]]:
+    """로 파일을 하나씩 읽어 문서 단위로 흘려보내기 (전체 코퍼스를 메모리에 올리지 않음)
+
+    _PREFETCH_WINDOW개 파일씩 비동기로 미리 읽어 디스크 대기 시간을 겹친다.
+    """
+    # _processed_at은 실행 단위 정보이므로 한 번만 계산
+    now_iso = datetime.now().isoformat()
+    for start in range(0, len(files_to_process), _PREFETCH_WINDOW):
+        window = files_to_process[start:start + _PREFETCH_WINDOW]
+        prefetched = asyncio.run(_prefetch_files([path for path, _ in window]))
+        for (path, file_source), raw in zip(window, prefetched):
+            suffix = path.suffix.lower()
+            if suffix == ".jsonl":
+                # JSONL: 줄마다 문서 하나
+                for item in _iter_jsonl(path, raw):
+                    item = to_nfc(item)
+                    item['_file_source'] = file_source
+                    item['_processed_at'] = now_iso
+                    yield item
+            elif suffix == ".json":
                 try:
-                    data = json.load(f)
+                    data = to_nfc(orjson.loads(raw) if raw is not None else read_json_file(path))
                     if isinstance(data, list):
                         # 새로운 타임스탬프 추가
                         for item in data:
                             if isinstance(item, dict):
-                                # 파일이 어느 디렉토리에서 왔는지 결정
-                                try:
-                                    if RAW_DIR in path.parents or path.parent == RAW_DIR:
-                                        item['_file_source'] = f"raw/{path.relative_to(RAW_DIR)}"
-                                    else:
-                                        item['_file_source'] = f"merged/{path.relative_to(MERGED_DIR)}"
-                                except ValueError:
-                                    item['_file_source'] = str(path.name)
-                                item['_processed_at'] = datetime.now().isoformat()
-                        docs.extend(data)
+                                item['_file_source'] = file_source
+                                item['_processed_at'] = now_iso
+                        yield from data
                     else:
-                        # 파일이 어느 디렉토리에서 왔는지 결정
-                        try:
-                            if RAW_DIR in path.parents or path.parent == RAW_DIR:
-                                data['_file_source'] = f"raw/{path.relative_to(RAW_DIR)}"
-                            else:
-                                data['_file_source'] = f"merged/{path.relative_to(MERGED_DIR)}"
-                        except ValueError:
-                            data['_file_source'] = str(path.name)
-                        data['_processed_at'] = datetime.now().isoformat()
-                        docs.append(data)
-                except json.JSONDecodeError:
+                        data['_file_source'] = file_source
+                        data['_processed_at'] = now_iso
+                        yield data
+                except orjson.JSONDecodeError:
                     log.warning("JSON decode failed: %s", path)
-        else:
-            # html / txt
-            with path.open(encoding="utf-8") as f:
-                # 파일이 어느 디렉토리에서 왔는지 결정
-                try:
-                    if RAW_DIR in path.parents or path.parent == RAW_DIR:
-                        file_source = f"raw/{path.relative_to(RAW_DIR)}"
-                    else:
-                        file_source = f"merged/{path.relative_to(MERGED_DIR)}"
-                except ValueError:
-                    file_source = str(path.name)
+            else:
+                # html / txt
+                if raw is not None:
+                    # 텍스트 모드 읽기와 같도록 줄바꿈 통일
+                    text = raw.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n")
+                else:
+                    text = path.read_text(encoding="utf-8")
                     
                 doc_data = {
-                    "title": path.stem, 
-                    "body": f.read(), 
+                    "title": to_nfc(path.stem), 
+                    "body": to_nfc(text), 
                     "source": str(path),
                     '_file_source': file_source,
-                    '_processed_at': datetime.now().isoformat()
+                    '_processed_at': now_iso
                 }
-                docs.append(doc_data)
-    
-    return docs
+                yield doc_data
+
+
+def _init_sentence_worker(chunk_size: int) -> None:
+    """문장 분리 워커 초기화 (spawn 환경에서도 CLI로 바꾼 청크 크기를 유지, Kiwi는 단일 스레드)"""
+    global CHUNK_SIZE, KIWI_WORKERS
+    CHUNK_SIZE = chunk_size
+    KIWI_WORKERS = 1
+
+
+def create_sentence_pool(workers: int):
+    """문서 단위 문장 분리를 나눠 맡을 프로세스 풀 (workers <= 1이면 None)
+
+    Linux에서는 fork로 모듈 상태를 그대로 물려받고, 그 외에는 spawn을 사용한다.
+    메인 프로세스는 Kiwi를 만들지 않으므로 fork 시 Kiwi 내부 스레드가 복제될 일이 없다.
+    """
+    if workers <= 1:
+        return None
+    method = "fork" if "fork" in mp.get_all_start_methods() else "spawn"
+    return mp.get_context(method).Pool(
+        processes=workers,
+        initializer=_init_sentence_worker,
+        initargs=(CHUNK_SIZE,),
+    )
+
+
+_META_KEYS = (
+    "url", "source", "date", "timestamp",  # 기본 필드들
+    "views", "likes", "quality_score",     # 수치 정보
+    "class_name",                          # 카테고리/클래스 정보
+)
 
 
 def extract_metadata(doc: Dict[str, Any]) -> Dict[str, Any]:
     """문서에서 메타데이터 추출"""
-    metadata = {}
-    
-    # 기본 필드들
-    if "url" in doc:
-        metadata["url"] = doc["url"]
-    if "source" in doc:
-        metadata["source"] = doc["source"]
-    if "date" in doc:
-        metadata["date"] = doc["date"]
-    if "timestamp" in doc:
-        metadata["timestamp"] = doc["timestamp"]
-    
-    # 수치 정보
-    if "views" in doc:
-        metadata["views"] = doc["views"]
-    if "likes" in doc:
-        metadata["likes"] = doc["likes"]
-    if "quality_score" in doc:
-        metadata["quality_score"] = doc["quality_score"]
-    
-    # 카테고리/클래스 정보
-    if "class_name" in doc:
-        metadata["class_name"] = doc["class_name"]
-    
-    return metadata
+    return {k: doc[k] for k in _META_KEYS if k in doc}
 
 
 # ─────────────────────────────────────────────────────────────
 # 4️⃣ 개선된 메인 파이프라인
 def main(incremental: bool = False) -> None:
     log.info("🔍 raw 문서 로드 중…")
-    raw_docs = load_raw_files(incremental=incremental)
-    log.info("✅ %d개 로드 완료", len(raw_docs))
+    files_to_process = list_raw_files(incremental=incremental)
 
     # 증분 모드에서 처리할 새 파일이 없으면 종료
-    if incremental and not raw_docs:
+    if incremental and not files_to_process:
         log.info("✅ 전처리 완료! (처리할 새 파일 없음)")
         return
 
     # 증분 모드일 때만 기존 ID 로드 (중복 방지)
     existing_ids = set()
+    _DUP_COUNTER.clear()
+    existing_prefixes = set()  # "doc_<hash>" 부분만 모은 집합 (문서 단위 O(1) 조회)
     if incremental:
         existing_ids = load_existing_processed_docs()
+        existing_prefixes = {eid.rsplit('_chunk_', 1)[0] for eid in existing_ids}
         log.info(f"📋 기존 처리된 문서 ID: {len(existing_ids)}개")
 
-    splitter = RecursiveCharacterTextSplitter(
-        chunk_size=CHUNK_SIZE,
-        chunk_overlap=CHUNK_OVERLAP,
-        separators=["\n\n", "\n", ".", "!", "?", " ", ""],
-    )
+    # 동일 본문 중복 제거: 증분 모드는 이전 실행의 지문까지 포함 (전체 모드는 출력을 새로 쓰므로 초기화)
+    seen_hashes = load_seen_hashes() if incremental else set()
+    new_hashes: List[str] = []
+
+    # 증분 모드는 append, 전체 모드는 새로 생성 (orjson 바이트를 1MiB 버퍼로 기록)
+    mode = "ab" if incremental and PROCESSED_SAVE_PATH.exists() else "wb"
+    out_f = PROCESSED_SAVE_PATH.open(mode, buffering=1 << 20)
 
-    # 증분 모드는 append, 전체 모드는 새로 생성
-    mode = "a" if incremental and PROCESSED_SAVE_PATH.exists() else "w"
-    out_f = PROCESSED_SAVE_PATH.open(mode, encoding="utf-8")
+    sentence_cache = SentenceCache(KIWI_CACHE_PATH)
+    pool = create_sentence_pool(PREPROCESS_WORKERS)
+    if pool is not None:
+        log.info(f"🧵 문장 분리 워커 {PREPROCESS_WORKERS}개 사용")
 
     processed = 0
     skipped_duplicates = 0
+    skipped_same_content = 0
+
+    # (idx, doc, title, merged, fingerprint, content_preview) — KIWI_BATCH_SIZE개씩 모아 한 번에 문장 분리
+    pending: List[Tuple[int, Dict[str, Any], str, str, str, str]] = []
+    # 직렬화된 레코드를 WRITE_BATCH_SIZE개씩 모아 writelines로 기록
+    write_buffer: List[bytes] = []
+
+    def flush_pending() -> int:
+        """대기 중인 문서를 문장 분리 → 청크 → 기록하고 기록한 청크 수 반환"""
+        # 정규식으로 나뉘는 본문은 캐시를 거치지 않고, Kiwi가 필요한 본문만 캐시 조회/저장
+        cached = [_fast_split(item[3]) for item in pending]
+        for i, sents in enumerate(cached):
+            if sents is None:
+                cached[i] = sentence_cache.get(pending[i][4])
+        misses = [i for i, sents in enumerate(cached) if sents is None]
+        if misses:
+            texts = [pending[i][3] for i in misses]
+            if pool is not None:
+                # 문서마다 독립적인 CPU 작업이므로 워커에 나눠 맡기고 순서대로 받기
+                results = pool.imap(sent_tokenize, texts, chunksize=32)
+            else:
+                results = sent_tokenize_batch(texts)
+            for i, sents in zip(misses, results):
+                cached[i] = sents
+                sentence_cache.put(pending[i][4], sents)
+
+        written = 0
+        for (idx, doc, title, _, _, content_preview), sentences in zip(pending, cached):
+            # 긴 문서는 sentence 단위로 split 후 문장 경계 그대로 chunk
+            chunks = pack_sentences(sentences, CHUNK_SIZE, CHUNK_OVERLAP)
+
+            # 메타데이터 추출 후 문서당 한 번만 직렬화해 모든 청크 레코드에 이어 붙임
+            metadata = extract_metadata(doc)
+            metadata |= {
+                "title": title,
+                "doc_index": idx,  # id_raw 대신 doc_index 사용
+                "_file_source": doc.get('_file_source', ''),
+                "_processed_at": doc.get('_processed_at', '')
+            }
+            metadata_tail = b',"metadata":' + orjson.dumps(metadata) + b"}\n"
+
+            # 청크 ID는 "doc_<hash>[_dupN]_chunk_<i>" — 중복 접미사는 문서당 한 번만 결정
+            base_id = generate_document_id(doc, 0, content_preview)
+            if incremental:
+                base_id = check_id_uniqueness(base_id, existing_ids)
+            id_prefix = base_id.rsplit('_chunk_', 1)[0]
+            chunk_ids = [f"{id_prefix}_chunk_{i}" for i in range(len(chunks))]
+            
+            # 증분 모드에서 ID 고유성 보장
+            if incremental:
+                if any(cid in existing_ids for cid in chunk_ids):
+                    # 이전 방식(청크별 접미사)으로 만든 ID와 겹치는 드문 경우만 청크별로 검사
+                    for i, cid in enumerate(chunk_ids):
+                        chunk_ids[i] = check_id_uniqueness(cid, existing_ids)
+                        existing_ids.add(chunk_ids[i])
+                else:
+                    existing_ids.update(chunk_ids)
+            
+            for doc_id, chunk in zip(chunk_ids, chunks):
+                # {"id": ..., "content": ..., "metadata": ...} 레코드와 동일한 바이트
+                # (ID는 doc_<hex>[_dupN]_chunk_<n> 형태의 ASCII라 이스케이프 없이 그대로 기록)
+                write_buffer.append(
+                    b'{"id":"' + doc_id.encode("ascii")
+                    + b'","content":' + orjson.dumps(chunk)
+                    + metadata_tail
+                )
+                written += 1
+                if len(write_buffer) >= WRITE_BATCH_SIZE:
+                    out_f.writelines(write_buffer)
+                    write_buffer.clear()
+        pending.clear()
+        return written
     
-    for idx, doc in enumerate(raw_docs):
+    total_docs = 0
+    for idx, doc in enumerate(iter_raw_files(files_to_process)):
+        total_docs += 1
         # 제목과 본문 추출
         title = doc.get("title", "").strip()
         # 'body' 키를 우선 확인하고, 없으면 'content' 확인
-        content = doc.get("body", "") or doc.get("content", "")
-        content = clean_html(content)
+        raw_content = doc.get("body", "") or doc.get("content", "")
+        content = clean_and_normalize(raw_content)
+        title_norm = normalize_abbr(title)
+        # 문서 ID용 본문 미리보기: 약어 사전이 비어 있고 엔티티가 없으면 정리된 본문 앞부분과 같음
+        content_preview = (
+            content[:100] if not _ABBR_MAP and "&" not in raw_content else id_content_preview(raw_content)
+        )
         
         # title과 content가 동일하거나 content가 비어있으면 content만 사용
-        if not content or content.strip() == title:
-            merged = title
+        if not content or content == title_norm:
+            merged = title_norm
         else:
-            merged = f"{title}\n{content}" if title else content
-        merged = normalize_abbr(merged)
+            merged = f"{title_norm}\n{content}" if title_norm else content
 
-        # 긴 문서는 sentence 단위로 split 후 chunk
-        sentences = sent_tokenize(merged)
-        merged_clean = "\n".join(sentences)
+        # 이미 본 본문(미러/재게시)이면 문장 분리·청킹 전에 건너뛰기
+        fingerprint = content_fingerprint(merged)
+        if fingerprint in seen_hashes:
+            skipped_same_content += 1
+            log.debug(f"문서 건너뛰기 (동일 본문): {title[:50]}...")
+            continue
+        seen_hashes.add(fingerprint)
+        new_hashes.append(fingerprint)
 
-        chunks = splitter.split_text(merged_clean)
-        
-        # 메타데이터 추출
-        metadata = extract_metadata(doc)
-        metadata.update({
-            "title": title,
-            "doc_index": idx,  # id_raw 대신 doc_index 사용
-            "_file_source": doc.get('_file_source', ''),
-            "_processed_at": doc.get('_processed_at', '')
-        })
-
-        # 증분 모드에서 이미 처리된 문서인지 확인
+        # 증분 모드에서 이미 처리된 문서인지 확인 (문장 분리 전에 판정)
         if incremental:
             # 기본 문서ID로 중복 체크 (청크 0 기준)
-            base_doc_id = generate_document_id(doc, 0)
+            base_doc_id = generate_document_id(doc, 0, content_preview)
             base_prefix = base_doc_id.replace('_chunk_0', '')
             
             # 이미 처리된 문서인지 확인
-            already_processed = any(existing_id.startswith(base_prefix) for existing_id in existing_ids)
+            already_processed = base_prefix in existing_prefixes
             
             if already_processed:
-                skipped_duplicates += len(chunks)
+                skipped_duplicates += 1
                 log.debug(f"문서 건너뛰기 (이미 처리됨): {title[:50]}...")
                 continue
+            # 같은 실행 안에서 뒤에 오는 동일 ID 문서도 건너뛰도록 미리 등록
+            existing_prefixes.add(base_prefix)
 
-        for chunk_idx, chunk in enumerate(chunks):
-            # 새로운 ID 생성 로직 사용
-            doc_id = generate_document_id(doc, chunk_idx)
-            
-            # 증분 모드에서 ID 고유성 보장
-            if incremental:
-                doc_id = check_id_uniqueness(doc_id, existing_ids)
-                existing_ids.add(doc_id)
-            
-            rec = {
-                "id": doc_id,
-                "content": chunk,
-                "metadata": metadata.copy(),  # 각 청크마다 복사본 생성
-            }
-            out_f.write(json.dumps(rec, ensure_ascii=False) + "\n")
-            processed += 1
+        pending.append((idx, doc, title, merged, fingerprint, content_preview))
+        if len(pending) >= KIWI_BATCH_SIZE:
+            processed += flush_pending()
+
+    if pending:
+        processed += flush_pending()
+    if write_buffer:
+        out_f.writelines(write_buffer)
 
     out_f.close()
+    sentence_cache.close()
+    if pool is not None:
+        pool.close()
+        pool.join()
+    log.info("✅ %d개 문서 로드 완료", total_docs)
+    save_seen_hashes(new_hashes, append=incremental)
     log.info("🚀 %d개 청크 저장 → %s", processed, PROCESSED_SAVE_PATH)
     
     # 처리 통계 출력
     log.info("📊 처리 통계:")
-    log.info(f"   - 원본 문서: {len(raw_docs)}개")
+    log.info(f"   - 원본 문서: {total_docs}개")
     log.info(f"   - 생성된 청크: {processed}개")
     if skipped_duplicates > 0:
-        log.info(f"   - 중복 건너뛰기: {skipped_duplicates}개")
-    if len(raw_docs) > 0:
-        log.info(f"   - 평균 청크/문서: {processed/len(raw_docs):.1f}")
+        log.info(f"   - 중복 건너뛰기: {skipped_duplicates}개 문서")
+    if sentence_cache.hits > 0:
+        log.info(f"   - Kiwi 캐시 적중: {sentence_cache.hits}/{sentence_cache.hits + sentence_cache.misses}개 문서")
+    if skipped_same_content > 0:
+        log.info(f"   - 동일 본문 건너뛰기: {skipped_same_content}개 문서")
+    if total_docs > 0:
+        log.info(f"   - 평균 청크/문서: {processed/total_docs:.1f}")
 
 
 # ─────────────────────────────────────────────────────────────
@@ -473,6 +1106,13 @@ if __name__ == "__main__":
         help=f"청크 겹침 크기 (기본: {CHUNK_OVERLAP})"
     )
     
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=PREPROCESS_WORKERS,
+        help=f"문장 분리 워커 프로세스 수 (기본: {PREPROCESS_WORKERS}, 1이면 단일 프로세스)"
+    )
+    
     parser.add_argument(
         "--force",
         action="store_true",
@@ -492,6 +1132,7 @@ if __name__ == "__main__":
     # 청크 설정 업데이트
     CHUNK_SIZE = args.chunk_size
     CHUNK_OVERLAP = args.chunk_overlap
+    PREPROCESS_WORKERS = args.workers
     
     # 강제 모드 처리
     if args.force:
@@ -501,6 +1142,9 @@ if __name__ == "__main__":
         if PROCESSED_CACHE_PATH.exists():
             PROCESSED_CACHE_PATH.unlink() 
             log.info(f"🗑️ 기존 캐시 파일 삭제: {PROCESSED_CACHE_PATH}")
+        if PROCESSED_DEDUP_PATH.exists():
+            PROCESSED_DEDUP_PATH.unlink()
+            log.info(f"🗑️ 기존 본문 지문 파일 삭제: {PROCESSED_DEDUP_PATH}")
     
     # 시작 메시지
     mode_emoji = "🔄" if args.incremental else "📋"
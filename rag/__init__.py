@@ -8,7 +8,9 @@ RAG 패키지 - 구조화된 RAG 시스템
 from .service import (
     StructuredRAGService,
     get_structured_rag_service,
-    get_structured_rag_answer
+    get_structured_rag_answer,
+    aget_structured_rag_answer,
+    astream_structured_rag_answer
 )
 
 # 유틸리티 클래스들 (선택적 사용)
@@ -22,6 +24,8 @@ __all__ = [
     'StructuredRAGService',
     'get_structured_rag_service', 
     'get_structured_rag_answer',
+    'aget_structured_rag_answer',
+    'astream_structured_rag_answer',
     
     # 유틸리티 클래스들
     'CacheManager',
@@ -2,66 +2,326 @@
 RAG 시스템을 위한 캐싱 유틸리티
 """
 import hashlib
+import mmap
+import os
 import pickle
+import re
+import sqlite3
+import threading
 import time
+import unicodedata
+from collections import OrderedDict
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Callable, Dict, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from langchain_core.embeddings import Embeddings
 from utils import get_logger
 
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    from langchain.docstore.document import Document
+except ImportError:
+    Document = None
+
+# msgpack 확장 타입 코드 (Document → [page_content, metadata])
+_DOCUMENT_EXT_CODE = 1
+
+# zstd 프레임 매직 바이트 (압축 여부와 무관하게 기존 pickle 캐시도 읽기 위함)
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+# 명성 구간 폭 (같은 구간의 캐릭터는 캐시를 공유)
+FAME_BAND_WIDTH = 5000
+
+_PUNCT_RE = re.compile(r"[^\w\s]+")
+_WS_RE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=4096)
+def normalize_query(query: str) -> str:
+    """캐시 키용 쿼리 정규화 (NFKC + 소문자 + 문장부호 제거 + 공백 정리)
+
+    "메이지 스펙업?"과 " 메이지  스펙업" 같은 표기 차이가 같은 캐시를 쓰도록 한다.
+    """
+    text = unicodedata.normalize("NFKC", query).lower()
+    normalized = _WS_RE.sub(" ", _PUNCT_RE.sub(" ", text)).strip()
+    # 문장부호만으로 된 쿼리는 그대로 키로 사용
+    return normalized or _WS_RE.sub(" ", text).strip()
+
+
+@lru_cache(maxsize=4096)
+def _digest_cache_input(cache_input: str) -> str:
+    """캐시 키 입력 문자열의 해시 (같은 쿼리가 반복되면 정규화/해시를 다시 계산하지 않음)"""
+    # 암호학적 강도는 필요 없으므로 짧은 입력에 빠른 xxh3_64 사용 (미설치 시 blake2b 8바이트)
+    if xxhash is not None:
+        return xxhash.xxh3_64_hexdigest(cache_input.encode('utf-8'))
+    return hashlib.blake2b(cache_input.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def prewarm_file(path: Path) -> int:
+    """파일을 mmap으로 열어 순차적으로 모든 페이지를 건드려 페이지 캐시에 올림
+
+    콜드 스타트 시 인덱스/DB 파일의 4KB 랜덤 읽기 대신 순차 readahead를 유도한다.
+    반환값: 읽은 바이트 수 (빈 파일이나 실패 시 0)
+    """
+    try:
+        size = path.stat().st_size
+        if size == 0:
+            return 0
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if hasattr(mm, "madvise"):
+                mm.madvise(mmap.MADV_WILLNEED)
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            for offset in range(0, size, mmap.PAGESIZE):
+                mm[offset]
+        return size
+    except (OSError, ValueError):
+        return 0
+
+
+def prewarm_paths(paths: Iterable[Path]) -> threading.Thread:
+    """파일/디렉토리 목록을 백그라운드 데몬 스레드에서 예열 (디렉토리는 하위 파일 전체)"""
+    logger = get_logger(__name__)
+
+    def _run():
+        start = time.time()
+        total = 0
+        for path in paths:
+            if path.is_dir():
+                for root, _, files in os.walk(path):
+                    for name in files:
+                        total += prewarm_file(Path(root) / name)
+            elif path.is_file():
+                total += prewarm_file(path)
+        logger.debug(f"🔥 인덱스 파일 예열 완료: {total / (1 << 20):.1f}MB ({time.time() - start:.2f}초)")
+
+    thread = threading.Thread(target=_run, name="prewarm", daemon=True)
+    thread.start()
+    return thread
+
+
+# 검색 캐시 키 네임스페이스 (키 해시 방식이 바뀌면 올려서 이전 항목은 만료되도록 둠)
+SEARCH_CACHE_KEY_VERSION = "v2"
+
+# 검색 캐시 DB의 직렬화 형식 구분값
+_FORMAT_PICKLE = 0
+_FORMAT_MSGPACK = 1
+_FORMAT_JSON = 2
+
+# JSON 형식에서 Document를 표시하는 키 ({"__document__": [page_content, metadata]})
+_JSON_DOCUMENT_KEY = "__document__"
+
+
+def _msgpack_default(obj: Any) -> Any:
+    """msgpack이 모르는 타입 직렬화 (Document만 지원, 나머지는 TypeError → pickle 대체)"""
+    if Document is not None and isinstance(obj, Document):
+        payload = msgpack.packb([obj.page_content, obj.metadata],
+                                default=_msgpack_default, use_bin_type=True)
+        return msgpack.ExtType(_DOCUMENT_EXT_CODE, payload)
+    raise TypeError(f"msgpack 직렬화 불가 타입: {type(obj).__name__}")
+
+
+def _msgpack_ext_hook(code: int, data: bytes) -> Any:
+    """msgpack 확장 타입 역직렬화"""
+    if code == _DOCUMENT_EXT_CODE and Document is not None:
+        page_content, metadata = msgpack.unpackb(data, raw=False, ext_hook=_msgpack_ext_hook,
+                                                 strict_map_key=False)
+        return Document(page_content=page_content, metadata=metadata)
+    return msgpack.ExtType(code, data)
+
+
+def _json_default(obj: Any) -> Any:
+    """orjson이 모르는 타입 직렬화 (Document만 지원)"""
+    if Document is not None and isinstance(obj, Document):
+        return {_JSON_DOCUMENT_KEY: [obj.page_content, obj.metadata]}
+    raise TypeError(f"JSON 직렬화 불가 타입: {type(obj).__name__}")
+
+
+def _json_restore(obj: Any) -> Any:
+    """_json_default로 표시한 Document 복원 (orjson은 object_hook이 없으므로 한 번 순회)"""
+    if isinstance(obj, dict):
+        if len(obj) == 1 and _JSON_DOCUMENT_KEY in obj and Document is not None:
+            page_content, metadata = obj[_JSON_DOCUMENT_KEY]
+            return Document(page_content=page_content, metadata=metadata)
+        return {key: _json_restore(value) for key, value in obj.items()}
+    if isinstance(obj, list):
+        return [_json_restore(item) for item in obj]
+    return obj
+
+
+def _dumps_cached_item(item: Any) -> bytes:
+    """pickle(최고 프로토콜) 직렬화 후 zstandard가 있으면 zstd로 압축"""
+    data = pickle.dumps(item, protocol=pickle.HIGHEST_PROTOCOL)
+    if zstandard is None:
+        return data
+    return zstandard.ZstdCompressor(level=3).compress(data)
+
+
+def _loads_cached_item(data: bytes) -> Any:
+    """_dumps_cached_item의 역 (압축되지 않은 기존 pickle 캐시도 그대로 읽음)"""
+    if data[:4] == _ZSTD_MAGIC:
+        if zstandard is None:
+            raise RuntimeError("zstd로 압축된 캐시이지만 zstandard가 설치되어 있지 않습니다")
+        data = zstandard.ZstdDecompressor().decompress(data)
+    return pickle.loads(data)
+
 
 class CacheManager:
     """캐싱 관련 기능을 담당하는 클래스"""
     
-    def __init__(self, cache_dir: Path, expiry_short: int = 43200, expiry_long: int = 86400):
+    def __init__(self, cache_dir: Path, expiry_short: int = 43200, expiry_long: int = 86400,
+                 memory_cache_size: int = 1024):
         """
         Args:
             cache_dir: 캐시 디렉토리 경로
             expiry_short: 단기 캐시 만료 시간 (초, 기본 12시간)
             expiry_long: 장기 캐시 만료 시간 (초, 기본 24시간)
+            memory_cache_size: 검색 결과 메모리 LRU 최대 항목 수 (0이면 비활성화)
         """
         self.cache_dir = cache_dir
         self.cache_dir.mkdir(exist_ok=True)
         self.expiry_short = expiry_short
         self.expiry_long = expiry_long
         self.logger = get_logger(__name__)
+        
+        # 검색 결과 메모리 캐시: DB 키("v2:{cache_type}_{해시}") → (만료 시각, 결과)
+        self.memory_cache_size = memory_cache_size
+        self._memory_cache: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._memory_lock = threading.Lock()
+        
+        # 검색 결과 디스크 캐시: 키마다 파일을 만들지 않고 SQLite(WAL) 한 파일에 저장
+        self._db_lock = threading.Lock()
+        self._db = self._open_search_db(self.cache_dir / "search_cache.db")
+    
+    def _open_search_db(self, db_path: Path) -> Optional[sqlite3.Connection]:
+        """검색 캐시 DB 열기 (실패 시 메모리 캐시만 사용)"""
+        try:
+            conn = sqlite3.connect(str(db_path), timeout=5.0, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS search_cache ("
+                "k TEXT PRIMARY KEY, ts REAL NOT NULL, fmt INTEGER NOT NULL, blob BLOB NOT NULL)"
+            )
+            conn.commit()
+            return conn
+        except sqlite3.Error as e:
+            self.logger.warning(f"⚠️ 검색 캐시 DB 열기 실패 ({db_path}): {e}. 메모리 캐시만 사용합니다.")
+            return None
+    
+    def close(self):
+        """검색 캐시 DB 닫기"""
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+    
+    @staticmethod
+    def _character_key(character_info: Optional[Dict]) -> str:
+        """캐릭터 정보 중 캐시 키에 쓰는 부분 (직업-명성 구간)"""
+        if not character_info:
+            return ""
+        fame = character_info.get('fame', '')
+        try:
+            fame_band = f"f{int(fame) // FAME_BAND_WIDTH}"
+        except (TypeError, ValueError):
+            fame_band = str(fame or '')
+        # FastAPI에서 변환된 키들을 사용
+        char_key_parts = [
+            character_info.get('job', ''),
+            fame_band
+        ]
+        # 주요 정보만으로 키 생성
+        return "-".join(filter(None, char_key_parts))
     
     def generate_cache_key(self, base_content: str, character_info: Optional[Dict] = None) -> str:
         """캐시 키 생성 (FastAPI에서 변환된 캐릭터 정보 포함 가능)"""
-        cache_input = base_content
-        if character_info:
-            # FastAPI에서 변환된 키들을 사용
-            char_key_parts = [
-                character_info.get('job', ''),
-                str(character_info.get('fame', ''))
-            ]
-            
-            # 주요 정보만으로 키 생성
-            simple_char_key = "-".join(filter(None, char_key_parts))
-            if simple_char_key:
-                cache_input = f"{base_content}|{simple_char_key}"
-        
-        return hashlib.md5(cache_input.encode('utf-8')).hexdigest()
+        cache_input = normalize_query(base_content)
+        simple_char_key = self._character_key(character_info)
+        if simple_char_key:
+            cache_input = f"{cache_input}|{simple_char_key}"
+        return _digest_cache_input(cache_input)
+    
+    def _memory_get(self, key: str) -> Optional[Any]:
+        """메모리 캐시 조회 (만료 항목은 제거)"""
+        with self._memory_lock:
+            entry = self._memory_cache.get(key)
+            if entry is None:
+                return None
+            expires_at, result = entry
+            if expires_at <= time.monotonic():
+                del self._memory_cache[key]
+                return None
+            self._memory_cache.move_to_end(key)
+            return result
+    
+    def _memory_put(self, key: str, result: Any, ttl: float):
+        """메모리 캐시 저장 (최대 크기 초과 시 가장 오래 안 쓴 항목 제거)"""
+        if self.memory_cache_size <= 0 or ttl <= 0:
+            return
+        with self._memory_lock:
+            self._memory_cache[key] = (time.monotonic() + ttl, result)
+            self._memory_cache.move_to_end(key)
+            while len(self._memory_cache) > self.memory_cache_size:
+                self._memory_cache.popitem(last=False)
+    
+    @staticmethod
+    def _cache_mtime(cache_path: Path) -> float:
+        """캐시 수정 시각 (디렉토리면 안의 파일 중 가장 최근 수정 시각)"""
+        if cache_path.is_dir():
+            return max((child.stat().st_mtime for child in cache_path.iterdir()), default=0.0)
+        return cache_path.stat().st_mtime
     
     def load_or_create_cached_item(self, 
                                    cache_file_name: str, 
                                    creation_func: Callable[[], Any], 
                                    expiry_seconds: int,
-                                   item_name: str = "항목") -> Any:
-        """캐시된 항목을 로드하거나 새로 생성"""
+                                   item_name: str = "항목",
+                                   load_func: Optional[Callable[[Path], Any]] = None,
+                                   save_func: Optional[Callable[[Any, Path], None]] = None) -> Any:
+        """캐시된 항목을 로드하거나 새로 생성
+
+        load_func/save_func를 주면 pickle 파일 대신 해당 함수로 읽고 쓴다
+        (예: 배열 파일 디렉토리로 저장하고 mmap으로 여는 인덱스).
+        """
         cache_file = self.cache_dir / cache_file_name
         
         # 캐시 파일이 존재하고 만료되지 않았으면 로드
         if cache_file.exists():
-            file_age = time.time() - cache_file.stat().st_mtime
+            file_age = time.time() - self._cache_mtime(cache_file)
             if file_age < expiry_seconds:
                 try:
                     self.logger.debug(f"🔄 캐시된 {item_name} 로딩: {cache_file_name}")
-                    with open(cache_file, 'rb') as f: 
-                        item = pickle.load(f)
+                    if load_func is not None:
+                        item = load_func(cache_file)
+                    else:
+                        with open(cache_file, 'rb') as f: 
+                            item = _loads_cached_item(f.read())
                     self.logger.debug(f"✅ {item_name} 캐시 로드 완료")
                     return item
                 except Exception as e:
                     self.logger.warning(f"⚠️ {item_name} 캐시 로드 실패 ({cache_file_name}): {e}. 재생성합니다.")
+            else:
+                self.logger.info(f"🔄 {item_name} 캐시 만료")
         
         # 캐시가 없거나 만료되었으면 새로 생성
         self.logger.info(f"🔄 {item_name} 생성 중 ({cache_file_name})...")
@@ -69,41 +329,262 @@ class CacheManager:
         
         # 생성된 항목을 캐시에 저장
         try:
-            with open(cache_file, 'wb') as f: 
-                pickle.dump(item, f)
+            if save_func is not None:
+                save_func(item, cache_file)
+            else:
+                with open(cache_file, 'wb') as f: 
+                    f.write(_dumps_cached_item(item))
             self.logger.debug(f"✅ {item_name} 캐시 저장 완료: {cache_file}")
         except Exception as e:
             self.logger.warning(f"⚠️ {item_name} 캐시 저장 실패 ({cache_file_name}): {e}")
         
         return item
     
+    def _search_key(self, query: str, cache_type: str, character_info: Optional[Dict]) -> str:
+        return f"{SEARCH_CACHE_KEY_VERSION}:{cache_type}_{self.generate_cache_key(query, character_info)}"
+    
+    @staticmethod
+    def _decode_search_blob(fmt: int, blob: bytes) -> Any:
+        if fmt == _FORMAT_MSGPACK:
+            return msgpack.unpackb(blob, raw=False, ext_hook=_msgpack_ext_hook, strict_map_key=False)
+        if fmt == _FORMAT_JSON:
+            return _json_restore(orjson.loads(blob))
+        # 이전 버전 또는 msgpack/JSON으로 표현할 수 없는 결과
+        return pickle.loads(blob)
+    
+    @staticmethod
+    def _decodable(fmt: int) -> bool:
+        """현재 설치된 라이브러리로 읽을 수 있는 형식인지"""
+        if fmt == _FORMAT_MSGPACK:
+            return msgpack is not None
+        if fmt == _FORMAT_JSON:
+            return orjson is not None
+        return True
+    
+    def warm_memory_cache(self) -> int:
+        """시작 시 만료되지 않은 최근 검색 결과를 메모리 캐시로 적재하고 만료 행은 삭제
+
+        Returns:
+            메모리에 적재한 항목 수
+        """
+        if self._db is None or self.memory_cache_size <= 0:
+            return 0
+        
+        cutoff = time.time() - self.expiry_short
+        try:
+            with self._db_lock:
+                self._db.execute("DELETE FROM search_cache WHERE ts <= ?", (cutoff,))
+                self._db.commit()
+                rows = self._db.execute(
+                    "SELECT k, ts, fmt, blob FROM search_cache ORDER BY ts DESC LIMIT ?",
+                    (self.memory_cache_size,),
+                ).fetchall()
+        except sqlite3.Error as e:
+            self.logger.warning(f"⚠️ 검색 캐시 예열 실패: {e}")
+            return 0
+        
+        now = time.time()
+        loaded = 0
+        # 오래된 것부터 넣어 최신 항목이 LRU 뒤쪽(가장 최근 사용)에 오도록 함
+        for key, saved_at, fmt, blob in reversed(rows):
+            if not self._decodable(fmt):
+                continue
+            try:
+                result = self._decode_search_blob(fmt, blob)
+            except Exception:
+                continue
+            self._memory_put(key, result, self.expiry_short - (now - saved_at))
+            loaded += 1
+        
+        self.logger.info(f"✅ 검색 캐시 예열: {loaded}개 항목 메모리 적재")
+        return loaded
+    
     def get_cached_search_result(self, query: str, cache_type: str, character_info: Optional[Dict] = None) -> Optional[Any]:
-        """캐시된 검색 결과 조회"""
-        cache_key = self.generate_cache_key(query, character_info)
-        cache_file_name = f"{cache_type}_{cache_key}.pkl"
-        cache_file = self.cache_dir / cache_file_name
+        """캐시된 검색 결과 조회 (메모리 LRU → SQLite 순)"""
+        db_key = self._search_key(query, cache_type, character_info)
+        result = self._memory_get(db_key)
+        if result is not None:
+            return result
         
-        if cache_file.exists():
-            file_age = time.time() - cache_file.stat().st_mtime
-            if file_age < self.expiry_short:
-                try:
-                    with open(cache_file, 'rb') as f: 
-                        return pickle.load(f)
-                except Exception as e:
-                    self.logger.warning(f"⚠️ {cache_type} 검색 캐시 로드 실패: {e}")
-                    return None
+        if self._db is None:
+            return None
+        
+        try:
+            with self._db_lock:
+                row = self._db.execute(
+                    "SELECT ts, fmt, blob FROM search_cache WHERE k = ?", (db_key,)
+                ).fetchone()
+        except sqlite3.Error as e:
+            self.logger.warning(f"⚠️ {cache_type} 검색 캐시 조회 실패: {e}")
+            return None
+        if row is None:
+            return None
+        
+        saved_at, fmt, blob = row
+        file_age = time.time() - saved_at
+        if file_age >= self.expiry_short:
+            return None
+        if not self._decodable(fmt):
+            return None
         
-        return None
+        try:
+            result = self._decode_search_blob(fmt, blob)
+        except Exception as e:
+            self.logger.warning(f"⚠️ {cache_type} 검색 캐시 로드 실패: {e}")
+            return None
+        # 디스크 캐시의 남은 유효 시간만큼만 메모리에 유지
+        self._memory_put(db_key, result, self.expiry_short - file_age)
+        return result
     
     def save_search_result_to_cache(self, query: str, result: Any, cache_type: str, character_info: Optional[Dict] = None):
-        """검색 결과를 캐시에 저장"""
-        cache_key = self.generate_cache_key(query, character_info)
-        cache_file_name = f"{cache_type}_{cache_key}.pkl"
-        cache_file = self.cache_dir / cache_file_name
+        """검색 결과를 캐시에 저장 (dict/list/Document는 msgpack → orjson 순, 둘 다 불가하면 pickle)"""
+        # 새 결과로 메모리 캐시 갱신 (이전 결과 무효화)
+        db_key = self._search_key(query, cache_type, character_info)
+        self._memory_put(db_key, result, self.expiry_short)
+        
+        if self._db is None:
+            return
+        
+        blob, fmt = None, _FORMAT_PICKLE
+        if msgpack is not None:
+            try:
+                blob, fmt = msgpack.packb(result, default=_msgpack_default, use_bin_type=True), _FORMAT_MSGPACK
+            except (TypeError, ValueError, OverflowError) as e:
+                self.logger.debug(f"msgpack 직렬화 불가: {e}")
+        if blob is None and orjson is not None:
+            try:
+                blob, fmt = orjson.dumps(result, default=_json_default), _FORMAT_JSON
+            except TypeError as e:
+                self.logger.debug(f"JSON 직렬화 불가, pickle 사용: {e}")
         
         try:
-            with open(cache_file, 'wb') as f: 
-                pickle.dump(result, f)
-            self.logger.debug(f"캐시 저장 완료: {cache_type}_{cache_key}")
+            if blob is None:
+                blob = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+            with self._db_lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO search_cache (k, ts, fmt, blob) VALUES (?, ?, ?, ?)",
+                    (db_key, time.time(), fmt, blob),
+                )
+                self._db.commit()
+            self.logger.debug(f"캐시 저장 완료: {db_key}")
         except Exception as e:
             self.logger.warning(f"⚠️ {cache_type} 검색 캐시 저장 실패: {e}")
+
+
+# 바이트별 1비트 개수 (해밍 거리 계산용)
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+class QueryEmbeddingMemo(Embeddings):
+    """임베딩 함수의 쿼리 임베딩 결과를 최근 max_size개까지 기억하는 래퍼
+
+    의미 캐시 조회, FAISS/Chroma 벡터 검색, 재시도에서 같은 쿼리의 임베딩 API를 한 번만 호출한다.
+    문서 임베딩은 캐시하지 않고 그대로 위임한다.
+    """
+    
+    def __init__(self, embedding_fn, max_size: int = 1024):
+        self.embedding_fn = embedding_fn
+        self.max_size = max_size
+        self._memo: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get_cached(self, text: str):
+        """기억된 임베딩 반환 (없으면 None, API 호출 없음)"""
+        with self._lock:
+            embedding = self._memo.get(text)
+            if embedding is not None:
+                self._memo.move_to_end(text)
+            return embedding
+    
+    def _put(self, text: str, embedding):
+        with self._lock:
+            self._memo[text] = embedding
+            self._memo.move_to_end(text)
+            while len(self._memo) > self.max_size:
+                self._memo.popitem(last=False)
+    
+    def embed_query(self, text: str):
+        embedding = self.get_cached(text)
+        if embedding is None:
+            embedding = self.embedding_fn.embed_query(text)
+            self._put(text, embedding)
+        return embedding
+    
+    async def aembed_query(self, text: str):
+        embedding = self.get_cached(text)
+        if embedding is None:
+            embedding = await self.embedding_fn.aembed_query(text)
+            self._put(text, embedding)
+        return embedding
+    
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embedding_fn.embed_documents(texts)
+    
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await self.embedding_fn.aembed_documents(texts)
+
+
+class SemanticQueryCache:
+    """쿼리 임베딩 유사도 기반 검색 결과 캐시 (프로세스 메모리, 근사 중복 질문용)
+
+    임베딩을 고정 난수 초평면에 사영한 부호 비트(SimHash)를 서명으로 저장하고, 같은 scope(직업) 안에서
+    해밍 거리 비율이 max_distance 미만인 항목을 같은 질문으로 본다. 서명은 한 배열에 모아
+    XOR + popcount 한 번으로 전체 항목과의 거리를 계산하며, 가득 차면 가장 오래 안 쓴 항목을 교체한다.
+    """
+    
+    def __init__(self, expiry_seconds: int, max_entries: int = 10000,
+                 max_distance: float = 0.1, n_bits: int = 256, seed: int = 0):
+        self.expiry_seconds = expiry_seconds
+        self.max_distance = max_distance
+        self.n_bits = n_bits
+        self._rng = np.random.default_rng(seed)
+        self._planes: Optional[np.ndarray] = None  # (임베딩 차원, n_bits), 첫 사용 시 생성
+        self._lock = threading.Lock()
+        
+        self._signatures = np.zeros((max_entries, n_bits // 8), dtype=np.uint8)
+        self._scope_ids = np.full(max_entries, -1, dtype=np.int64)  # -1 = 빈 슬롯
+        self._created = np.zeros(max_entries)
+        self._last_used = np.zeros(max_entries)
+        self._results: list = [None] * max_entries
+        self._scopes: Dict[str, int] = {}
+    
+    def _signature(self, embedding) -> np.ndarray:
+        vec = np.asarray(embedding, dtype=np.float32)
+        if self._planes is None or self._planes.shape[0] != vec.shape[0]:
+            self._planes = self._rng.standard_normal((vec.shape[0], self.n_bits)).astype(np.float32)
+        return np.packbits(vec @ self._planes > 0)
+    
+    def get(self, scope: str, embedding) -> Optional[Any]:
+        """같은 scope에서 충분히 가까운 쿼리의 결과 반환 (없으면 None)"""
+        now = time.time()
+        with self._lock:
+            scope_id = self._scopes.get(scope)
+            if scope_id is None:
+                return None
+            candidates = np.flatnonzero(
+                (self._scope_ids == scope_id) & (now - self._created < self.expiry_seconds)
+            )
+            if len(candidates) == 0:
+                return None
+            
+            signature = self._signature(embedding)
+            distances = _POPCOUNT[self._signatures[candidates] ^ signature].sum(axis=1, dtype=np.int64)
+            best = int(np.argmin(distances))
+            if distances[best] / self.n_bits >= self.max_distance:
+                return None
+            slot = candidates[best]
+            self._last_used[slot] = now
+            return self._results[slot]
+    
+    def put(self, scope: str, embedding, result: Any):
+        """결과 저장 (빈 슬롯이 없으면 가장 오래 안 쓴 항목 교체)"""
+        now = time.time()
+        with self._lock:
+            scope_id = self._scopes.setdefault(scope, len(self._scopes))
+            slot = int(np.argmin(self._last_used))
+            self._signatures[slot] = self._signature(embedding)
+            self._scope_ids[slot] = scope_id
+            self._created[slot] = now
+            self._last_used[slot] = now
+            self._results[slot] = result
+
@@ -0,0 +1,120 @@
+"""
+RAG 시스템을 위한 CrossEncoder 재랭커 구현
+"""
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+from langchain_community.cross_encoders.base import BaseCrossEncoder
+from utils import get_logger
+
+try:
+    import onnxruntime
+    from optimum.onnxruntime import ORTModelForSequenceClassification, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+    from transformers import AutoTokenizer
+except ImportError:
+    onnxruntime = None
+
+# 동적 int8 양자화 결과 파일명 (ORTQuantizer 기본값)
+_QUANTIZED_FILE_NAME = "model_quantized.onnx"
+
+
+def _cpu_has_flag(*flags: str) -> bool:
+    """CPU 명령어 플래그 중 하나라도 지원하는지 여부 (리눅스 /proc/cpuinfo 기준)"""
+    try:
+        with open("/proc/cpuinfo", "r", encoding="utf-8") as f:
+            cpuinfo = f.read()
+    except OSError:
+        return False
+    return any(flag in cpuinfo for flag in flags)
+
+
+def _cpu_supports_vnni() -> bool:
+    """AVX512-VNNI 지원 여부"""
+    return _cpu_has_flag("avx512_vnni")
+
+
+def cpu_supports_bf16() -> bool:
+    """네이티브 BF16 연산(AVX512-BF16 / AMX) 지원 여부 - 미지원 CPU에서는 bf16이 에뮬레이션되어 오히려 느림"""
+    return _cpu_has_flag("avx512_bf16", "amx_bf16")
+
+
+class OnnxInt8CrossEncoder(BaseCrossEncoder):
+    """ONNX Runtime + 동적 int8 양자화 CrossEncoder (CPU 전용)
+
+    처음 사용할 때 HuggingFace 모델을 ONNX로 내보내고 int8로 양자화해 model_dir에 저장하며,
+    이후에는 저장된 양자화 모델을 바로 로드한다.
+    """
+
+    def __init__(self, model_name: str, model_dir: Path, batch_size: int = 0, max_length: int = 256,
+                 cpu_threads: int = 0):
+        """
+        Args:
+            model_name: HuggingFace CrossEncoder 모델명
+            model_dir: 양자화 모델 저장 디렉토리
+            batch_size: 한 번의 추론에 넣는 (쿼리, 문서) 쌍 수 (0 이하면 전체를 한 번에)
+            max_length: (쿼리, 문서) 쌍 최대 토큰 길이
+            cpu_threads: ORT intra-op 스레드 수 (0이면 ORT 기본값)
+        """
+        self.logger = get_logger(__name__)
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.max_length = max_length
+
+        if not (model_dir / _QUANTIZED_FILE_NAME).exists():
+            self._export_quantized(model_name, model_dir)
+
+        session_options = onnxruntime.SessionOptions()
+        # 연산 융합/상수 폴딩 등 모든 그래프 최적화 적용 (세션 생성 시 한 번만 수행)
+        session_options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if cpu_threads > 0:
+            session_options.intra_op_num_threads = cpu_threads
+        self.model = ORTModelForSequenceClassification.from_pretrained(
+            model_dir, file_name=_QUANTIZED_FILE_NAME, session_options=session_options,
+            provider="CPUExecutionProvider",
+        )
+        self.tokenizer = AutoTokenizer.from_pretrained(model_dir)
+
+    @staticmethod
+    def is_available() -> bool:
+        return onnxruntime is not None
+
+    def _export_quantized(self, model_name: str, model_dir: Path):
+        """ONNX 내보내기 + 동적 int8 양자화 후 저장"""
+        self.logger.info(f"🔄 CrossEncoder ONNX int8 변환 중: {model_name} → {model_dir}")
+        model_dir.mkdir(parents=True, exist_ok=True)
+
+        model = ORTModelForSequenceClassification.from_pretrained(model_name, export=True)
+        if _cpu_supports_vnni():
+            qconfig = AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+        else:
+            qconfig = AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+        ORTQuantizer.from_pretrained(model).quantize(save_dir=model_dir, quantization_config=qconfig)
+
+        model.config.save_pretrained(model_dir)
+        AutoTokenizer.from_pretrained(model_name).save_pretrained(model_dir)
+        self.logger.info("✅ CrossEncoder ONNX int8 변환 완료")
+
+    def score(self, text_pairs: List[Tuple[str, str]]) -> np.ndarray:
+        """(쿼리, 문서) 쌍 점수 계산 - sentence-transformers CrossEncoder와 같은 스케일"""
+        if not text_pairs:
+            return np.empty(0, dtype=np.float32)
+
+        batch_size = self.batch_size if self.batch_size > 0 else len(text_pairs)
+        scores = []
+        for start in range(0, len(text_pairs), batch_size):
+            batch = text_pairs[start:start + batch_size]
+            features = self.tokenizer(
+                [query for query, _ in batch], [doc for _, doc in batch],
+                padding="longest", truncation=True, max_length=self.max_length, return_tensors="np",
+            )
+            logits = self.model(**features).logits
+            logits = np.asarray(logits, dtype=np.float32)
+            if logits.shape[1] == 1:
+                # 단일 출력 모델은 sentence-transformers와 동일하게 시그모이드 적용
+                scores.append(1.0 / (1.0 + np.exp(-logits[:, 0])))
+            else:
+                # (무관, 관련) 두 점수를 내는 모델은 관련 점수만 사용
+                scores.append(logits[:, 1])
+        return np.concatenate(scores)
@@ -1,9 +1,31 @@
 """
 RAG 시스템을 위한 검색기(Retriever) 클래스들
 """
-from typing import List, Optional
+import asyncio
+import re
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, ClassVar, Dict, List, Optional, Tuple, Union
 from langchain.docstore.document import Document
-from job_utils import find_job_in_text  
+from langchain.retrievers import ContextualCompressionRetriever
+from langchain_core.callbacks import AsyncCallbackManagerForRetrieverRun, CallbackManagerForRetrieverRun
+from langchain_core.retrievers import BaseRetriever
+from job_utils import find_job_in_text, find_jobs_in_text
+import numpy as np
+
+try:
+    import bm25s
+except ImportError:
+    bm25s = None
+
+try:
+    import faiss
+except ImportError:
+    faiss = None
+
+# 직업명/제목은 문서가 달라도 같은 값이 반복되므로 소문자 변환 결과를 재사용
+_lower_field = lru_cache(maxsize=8192)(str.lower)
 
 
 class MetadataAwareRetriever:
@@ -22,62 +44,457 @@ class MetadataAwareRetriever:
         """메타데이터 기반 스코어링으로 문서 검색 (쿼리 관련성 우선)"""
         # 기본 검색기로 문서 검색
         docs = self.base_retriever.get_relevant_documents(query)
+        return self._score_documents(query, docs)
+    
+    async def aget_relevant_documents(self, query: str) -> List[Document]:
+        """get_relevant_documents의 비동기 버전"""
+        docs = await self.base_retriever.ainvoke(query)
+        return self._score_documents(query, docs)
+    
+    @staticmethod
+    def _quality_scores(docs: List[Document]) -> np.ndarray:
+        """quality_score 메타데이터를 float 배열로 변환 (없거나 변환 불가면 0)"""
+        qualities = np.zeros(len(docs))
+        for i, doc in enumerate(docs):
+            value = (doc.metadata or {}).get("quality_score", 0.0)
+            if isinstance(value, (int, float)):
+                qualities[i] = value
+            else:
+                try:
+                    qualities[i] = float(value)
+                except (TypeError, ValueError):
+                    pass
+        return qualities
+    
+    def _score_documents(self, query: str, docs: List[Document]) -> List[Document]:
+        """메타데이터 기반 스코어링 후 상위 top_n개 반환"""
+        if not docs:
+            return []
         
-        # 쿼리 전처리
+        # 쿼리 전처리 (문서마다 반복하지 않도록 길이 조건별 단어 목록을 미리 생성)
         query_lower = query.lower()
         query_words = set(query_lower.split())
+        class_match_words = [word for word in query_words if len(word) > 2]
+        # 부분 매칭은 단어별 in 검사 대신 정규식 한 번으로 처리 (C 레벨에서 한 번만 스캔)
+        class_match_pattern = (
+            re.compile("|".join(map(re.escape, class_match_words))) if class_match_words else None
+        )
+        title_match_words = [word for word in query_words if len(word) > 1]
         
         # query 안에서 직업명 탐색
         character_job = find_job_in_text(query_lower)
         
-        # 메타데이터 기반 스코어링
-        scored_docs = []
-        for doc in docs:
-            score = 1.0
+        # 1. 쿼리 관련성 점수 (최우선) - 문자열 매칭이라 문서별로 계산
+        relevance = np.zeros(len(docs))
+        for i, doc in enumerate(docs):
             meta = doc.metadata or {}
-            
-            # 1. 쿼리 관련성 점수 (최우선)
             relevance_score = 0.0
             
             # 직업명 정확 매칭 - 최고 우선순위
             if class_name := meta.get("class_name", ""):
-                class_name_lower = class_name.lower()
+                class_name_lower = _lower_field(class_name)
                 # 정확한 직업명 매칭
                 if character_job and character_job in class_name_lower:
                     relevance_score += 10.0  # 매우 높은 보너스
                 # 부분 매칭
-                elif any(word in class_name_lower for word in query_words if len(word) > 2):
+                elif class_match_pattern and class_match_pattern.search(class_name_lower):
                     relevance_score += 3.0
             
             # 제목 매칭
             if title := meta.get("title", ""):
-                title_lower = title.lower()
+                title_lower = _lower_field(title)
                 # 직업명이 제목에 있는 경우
                 if character_job and character_job in title_lower:
                     relevance_score += 5.0
                 # 일반 쿼리 단어 매칭
-                matching_words = sum(1 for word in query_words if word in title_lower and len(word) > 1)
-                relevance_score += matching_words * 1.0
+                relevance_score += sum(1 for word in title_match_words if word in title_lower)
             
-            # 내용 매칭 (보조적)
-            content_lower = doc.page_content[:500].lower()  # 앞부분만 확인
-            if character_job and character_job in content_lower:
+            # 내용 매칭 (보조적, 앞부분만 확인)
+            if character_job and character_job in doc.page_content[:500].lower():
                 relevance_score += 2.0
             
-            # 2. 품질 점수 (보조적으로만 사용)
-            try:
-                quality = float(meta.get("quality_score", 0.0))
-                # 품질 점수는 최대 1.0까지만 영향
-                quality_boost = min(quality * 0.2, 1.0)
-                score += quality_boost
-            except ValueError:
-                pass
+            relevance[i] = relevance_score
+        
+        # 2. 품질 점수 (보조적으로만 사용, 최대 1.0까지만 영향)
+        quality_boost = np.minimum(self._quality_scores(docs) * 0.2, 1.0)
+        
+        # 최종 점수 = 기본 점수 + 품질 보너스 + 관련성 점수
+        scores = (1.0 + quality_boost) + relevance
+        
+        # 스코어 순으로 상위 N개 반환 (동점은 기존 순서 유지)
+        return [docs[i] for i in self._top_n_order(scores, self.top_n)]
+    
+    @staticmethod
+    def _top_n_order(scores: np.ndarray, top_n: int) -> np.ndarray:
+        """점수 상위 top_n개의 인덱스 (내림차순, 동점은 앞선 인덱스 우선)
+
+        후보가 top_n보다 많으면 argpartition으로 경계 점수를 구해 그 이상인 후보만 정렬한다
+        (전체 정렬과 같은 결과, O(N + top_n log top_n)).
+        """
+        n = len(scores)
+        if n <= top_n:
+            return np.argsort(-scores, kind="stable")
+        kth = scores[np.argpartition(scores, n - top_n)[n - top_n]]
+        candidates = np.flatnonzero(scores >= kth)
+        return candidates[np.argsort(-scores[candidates], kind="stable")][:top_n]
+
+
+class BM25SRetriever(BaseRetriever):
+    """bm25s 기반 BM25 검색기
+
+    rank_bm25처럼 문서마다 파이썬 루프를 돌지 않고, 희소 행렬(CSC) 곱 한 번으로
+    전체 문서 점수를 계산한다. 인덱스는 디렉토리에 저장해 mmap으로 다시 연다.
+    backend="numba"(또는 numba 설치 시 "auto")면 점수 계산과 top-k 선택을 JIT 커널로 처리한다.
+    """
+    
+    index: Any
+    corpus: Any  # [{"text", "metadata"}] 리스트 또는 mmap으로 연 bm25s 코퍼스
+    k: int = 25
+    
+    # bm25s 기본 패턴(\w\w+)은 한 글자 토큰(딜, 힘, 룬, 숫자)을 버리므로 한 글자부터 토큰으로 인정
+    TOKEN_PATTERN: ClassVar[str] = r"(?u)\b\w+\b"
+    
+    @staticmethod
+    def is_available() -> bool:
+        return bm25s is not None
+    
+    @classmethod
+    def _tokenize(cls, texts: Union[str, List[str]], return_ids: bool = True):
+        return bm25s.tokenize(texts, stopwords=None, token_pattern=cls.TOKEN_PATTERN,
+                              return_ids=return_ids, show_progress=False)
+    
+    @classmethod
+    def from_texts(cls, texts: List[str], metadatas: Optional[List[Dict]] = None, k: int = 25,
+                   backend: str = "auto") -> "BM25SRetriever":
+        """텍스트 리스트로 인덱스 생성 (토큰화는 bm25s.tokenize 한 번으로 처리)"""
+        metadatas = metadatas or [{}] * len(texts)
+        corpus: List[Dict[str, Any]] = [
+            {"text": text, "metadata": meta or {}} for text, meta in zip(texts, metadatas)
+        ]
+        index = bm25s.BM25(backend=backend)
+        index.index(cls._tokenize(texts), show_progress=False)
+        return cls(index=index, corpus=corpus, k=k)
+    
+    @classmethod
+    def from_documents(cls, documents: List[Document], k: int = 25, backend: str = "auto") -> "BM25SRetriever":
+        """문서 리스트로 인덱스 생성"""
+        return cls.from_texts(
+            [doc.page_content for doc in documents], [doc.metadata for doc in documents], k=k, backend=backend
+        )
+    
+    def save(self, save_dir: Path):
+        """인덱스와 코퍼스를 디렉토리에 저장"""
+        self.index.save(str(save_dir), corpus=self.corpus, show_progress=False)
+    
+    @classmethod
+    def load(cls, save_dir: Path, k: int = 25, mmap: bool = True, backend: str = "auto") -> "BM25SRetriever":
+        """저장된 인덱스 로드 (mmap 사용 시 필요한 부분만 디스크에서 읽음)"""
+        # 저장 당시 backend 대신 현재 환경 설정을 사용 (numba 설치 여부가 달라질 수 있음)
+        index = bm25s.BM25.load(
+            str(save_dir), load_corpus=True, mmap=mmap, show_progress=False,
+            override_params={"backend": backend},
+        )
+        return cls(index=index, corpus=index.corpus, k=k)
+    
+    def warmup(self) -> float:
+        """어휘 중 한 토큰으로 검색을 한 번 실행해 numba 커널을 미리 컴파일 (첫 사용자 쿼리의 JIT 지연 제거)
+
+        반환값: 소요 시간(초)
+        """
+        start = time.time()
+        vocab = getattr(self.index, "vocab_dict", None)
+        if vocab and len(self.corpus) > 0:
+            self.index.retrieve([[next(iter(vocab))]], k=1, show_progress=False)
+        return time.time() - start
+    
+    def get_scored_documents(self, query: str) -> List[Tuple[Document, float]]:
+        """BM25 점수와 함께 상위 k개 문서 반환"""
+        num_docs = len(self.corpus)
+        if num_docs == 0:
+            return []
+        
+        query_tokens = self._tokenize(query, return_ids=False)
+        if not query_tokens[0]:
+            # 토큰이 없는 쿼리 (기호만 입력 등) - numba 백엔드는 빈 토큰 리스트를 받지 않음
+            return []
+        results = self.index.retrieve(
+            query_tokens, corpus=self.corpus, k=min(self.k, num_docs), show_progress=False
+        )
+        # 점수 0 = 쿼리 토큰이 하나도 없는 문서이므로 임의 순서의 노이즈가 되지 않게 제외
+        return [
+            (Document(page_content=item["text"], metadata=item.get("metadata") or {}), float(score))
+            for item, score in zip(results.documents[0], results.scores[0]) if score > 0
+        ]
+    
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        return [doc for doc, _ in self.get_scored_documents(query)]
+
+
+class FaissMMRRetriever(BaseRetriever):
+    """FAISS HNSW 인덱스 + NumPy MMR 벡터 검색기
+
+    후보 fetch_k개는 FAISS(HNSW, 내적)로 찾고, MMR 재선택은 후보 벡터 블록에 대한
+    행렬 연산으로 처리한다. use_mmr=False면 유사도 상위 k개를 그대로 사용한다.
+    문서 본문/메타데이터는 선택된 k개만 Chroma에서 읽는다.
+    class_rows가 있으면 쿼리에 등장한 직업(과 직업 미분류) 문서로 후보 탐색 범위를 좁히고,
+    그 범위에서 k개를 채우지 못하면 전체에서 다시 찾는다.
+    """
+    
+    index: Any
+    ids: List[str]  # FAISS 행 번호 → Chroma 문서 ID
+    vectordb: Any
+    embedding_fn: Any
+    k: int = 25
+    fetch_k: int = 100
+    lambda_mult: float = 0.5
+    use_mmr: bool = True
+    class_rows: Optional[Dict[str, Any]] = None  # 소문자 직업명("" = 미분류) → FAISS 행 번호 배열
+    exact_search_rows: int = 4096  # 필터 대상이 이 이하면 HNSW 대신 직접 내적
+    max_ef_search: int = 1024
+    
+    @staticmethod
+    def is_available() -> bool:
+        return faiss is not None
+    
+    @staticmethod
+    def _mmr(query_sims: np.ndarray, vectors: np.ndarray, k: int, lambda_mult: float) -> List[int]:
+        """정규화된 후보 벡터에 대한 MMR 선택 (후보 내 위치 리스트 반환)"""
+        selected = [int(np.argmax(query_sims))]
+        # 각 후보와 지금까지 선택된 문서 사이의 최대 유사도
+        max_sim_to_selected = vectors @ vectors[selected[0]]
+        while len(selected) < min(k, len(query_sims)):
+            scores = lambda_mult * query_sims - (1.0 - lambda_mult) * max_sim_to_selected
+            scores[selected] = -np.inf
+            best = int(np.argmax(scores))
+            selected.append(best)
+            np.maximum(max_sim_to_selected, vectors @ vectors[best], out=max_sim_to_selected)
+        return selected
+    
+    def get_scored_documents(self, query: str) -> List[Tuple[Document, float]]:
+        """MMR로 고른 k개 문서를 쿼리 코사인 유사도와 함께 반환"""
+        if self.index.ntotal == 0:
+            return []
+        return self._search_by_vector(self.embedding_fn.embed_query(query), self._allowed_rows(query))
+    
+    async def aget_scored_documents(self, query: str) -> List[Tuple[Document, float]]:
+        """get_scored_documents의 비동기 버전 - 임베딩 API 호출을 스레드 없이 await"""
+        if self.index.ntotal == 0:
+            return []
+        embedding = await self.embedding_fn.aembed_query(query)
+        return await asyncio.to_thread(self._search_by_vector, embedding, self._allowed_rows(query))
+    
+    def _allowed_rows(self, query: str) -> Optional[np.ndarray]:
+        """쿼리에 등장한 직업의 문서와 직업 미분류 문서의 행 번호 (필터가 필요 없으면 None)"""
+        if not self.class_rows:
+            return None
+        jobs = [job.lower() for job in find_jobs_in_text(query)]
+        if not jobs:
+            return None
+        parts = [
+            rows for class_name, rows in self.class_rows.items()
+            if not class_name or any(job in class_name for job in jobs)
+        ]
+        if not parts:
+            return None
+        allowed = np.sort(np.concatenate(parts))
+        return allowed if len(allowed) < self.index.ntotal else None
+    
+    def _fetch_count(self) -> int:
+        """FAISS에서 가져올 후보 수 (MMR이면 fetch_k, 아니면 k)"""
+        return min(self.fetch_k if self.use_mmr else self.k, self.index.ntotal)
+    
+    def _search_candidates(self, query_vec: np.ndarray, allowed_rows: Optional[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+        """후보 (유사도, 행 번호) - allowed_rows가 있으면 그 안에서만 탐색"""
+        fetch_k = self._fetch_count()
+        if allowed_rows is None:
+            sims, rows = self.index.search(query_vec, fetch_k)
+            return sims[0], rows[0]
+        
+        if len(allowed_rows) <= self.exact_search_rows:
+            # 대상이 적으면 필터 HNSW 탐색보다 복원 벡터와 직접 내적하는 편이 빠르고 정확함
+            sims = self.index.reconstruct_batch(allowed_rows) @ query_vec[0]
+            top = np.argsort(-sims, kind="stable")[:fetch_k]
+            return sims[top], allowed_rows[top]
+        
+        # 대상 비율이 낮을수록 그래프 탐색 중 걸러지는 노드가 많으므로 efSearch를 비례해서 늘림
+        ef_search = int(min(self.max_ef_search, max(
+            self.index.hnsw.efSearch, fetch_k * self.index.ntotal / len(allowed_rows)
+        )))
+        params = faiss.SearchParametersHNSW(sel=faiss.IDSelectorBatch(allowed_rows), efSearch=ef_search)
+        sims, rows = self.index.search(query_vec, fetch_k, params=params)
+        return sims[0], rows[0]
+    
+    def _search_by_vector(self, embedding: List[float],
+                          allowed_rows: Optional[np.ndarray] = None) -> List[Tuple[Document, float]]:
+        """쿼리 임베딩으로 FAISS 후보 검색 → MMR 선택 → Chroma에서 본문 조회"""
+        query_vec = np.asarray([embedding], dtype="float32")
+        faiss.normalize_L2(query_vec)
+        sims, rows = self._search_candidates(query_vec, allowed_rows)
+        valid = rows >= 0
+        sims, rows = sims[valid], rows[valid]
+        if allowed_rows is not None and len(rows) < min(self.k, self._fetch_count()):
+            # 필터 범위에 문서가 부족하면 전체에서 다시 탐색 (소프트 필터)
+            return self._search_by_vector(embedding)
+        if len(rows) == 0:
+            return []
+        
+        if self.use_mmr:
+            picked = self._mmr(sims, self.index.reconstruct_batch(rows), self.k, self.lambda_mult)
+        else:
+            # 후보가 이미 유사도 내림차순이므로 벡터 복원 없이 앞에서부터 사용
+            picked = list(range(min(self.k, len(rows))))
+        picked_ids = [self.ids[rows[i]] for i in picked]
+        
+        store_data = self.vectordb.get(ids=picked_ids, include=["documents", "metadatas"])
+        by_id = {
+            doc_id: Document(page_content=txt, metadata=meta or {})
+            for doc_id, txt, meta in zip(store_data["ids"], store_data["documents"], store_data["metadatas"])
+        }
+        return [
+            (by_id[doc_id], float(sims[i]))
+            for doc_id, i in zip(picked_ids, picked) if doc_id in by_id
+        ]
+    
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        return [doc for doc, _ in self.get_scored_documents(query)]
+    
+    async def _aget_relevant_documents(self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun) -> List[Document]:
+        return [doc for doc, _ in await self.aget_scored_documents(query)]
+
+
+class DBSFRetriever(BaseRetriever):
+    """여러 검색기 결과를 DBSF(Distribution-Based Score Fusion)로 합치는 검색기
+
+    검색기마다 점수를 (평균 ± 3σ) 구간 기준으로 [0, 1]에 맞춘 뒤 가중합한다.
+    get_scored_documents()가 없는 검색기(Chroma MMR, rank_bm25 등)는 순위로 점수를 만든다.
+    같은 문서는 metadata의 doc_id(없으면 본문)로 합치며, 먼저 나온 검색기의 문서를 남긴다.
+    """
+    
+    retrievers: List[Any]
+    weights: List[float]
+    
+    @staticmethod
+    def _doc_key(doc: Document) -> str:
+        return (doc.metadata or {}).get("doc_id") or doc.page_content
+    
+    @staticmethod
+    def _scored_documents(retriever: Any, query: str, callbacks: Any) -> List[Tuple[Document, float]]:
+        if hasattr(retriever, "get_scored_documents"):
+            return retriever.get_scored_documents(query)
+        docs = retriever.invoke(query, config={"callbacks": callbacks})
+        # 점수가 없으면 순위를 선형 점수로 사용 (1등 = len(docs))
+        return [(doc, float(len(docs) - rank)) for rank, doc in enumerate(docs)]
+    
+    @staticmethod
+    def _normalize(scores: np.ndarray) -> np.ndarray:
+        mean, std = scores.mean(), scores.std()
+        if std == 0:
+            return np.ones_like(scores)
+        low = mean - 3.0 * std
+        return np.clip((scores - low) / (6.0 * std), 0.0, 1.0)
+    
+    @staticmethod
+    async def _ascored_documents(retriever: Any, query: str, callbacks: Any) -> List[Tuple[Document, float]]:
+        if hasattr(retriever, "aget_scored_documents"):
+            return await retriever.aget_scored_documents(query)
+        if hasattr(retriever, "get_scored_documents"):
+            # CPU 작업(BM25 등)은 스레드에서 실행해 다른 검색기의 네트워크 대기와 겹치게 함
+            return await asyncio.to_thread(retriever.get_scored_documents, query)
+        docs = await retriever.ainvoke(query, config={"callbacks": callbacks})
+        return [(doc, float(len(docs) - rank)) for rank, doc in enumerate(docs)]
+    
+    def _fuse(self, scored_lists: List[List[Tuple[Document, float]]]) -> List[Document]:
+        """검색기별 (문서, 점수) 리스트를 DBSF로 융합해 점수 내림차순 문서 리스트 반환"""
+        docs: List[Document] = []
+        positions: Dict[str, int] = {}
+        fused_parts = []
+        
+        for scored, weight in zip(scored_lists, self.weights):
+            if not scored:
+                continue
+            
+            # 한 검색기 안의 중복 문서는 첫 번째(최고 점수)만 사용
+            index_list, score_list, seen = [], [], set()
+            for doc, score in scored:
+                key = self._doc_key(doc)
+                if key in seen:
+                    continue
+                seen.add(key)
+                if key not in positions:
+                    positions[key] = len(docs)
+                    docs.append(doc)
+                index_list.append(positions[key])
+                score_list.append(score)
             
-            # 최종 점수 = 기본 점수 + 관련성 점수 + 품질 보너스
-            final_score = score + relevance_score
-            scored_docs.append((doc, final_score))
+            normalized = self._normalize(np.asarray(score_list, dtype=np.float64))
+            fused_parts.append((np.asarray(index_list), weight * normalized))
         
-        # 스코어 순으로 정렬하여 상위 N개 반환
-        scored_docs.sort(key=lambda x: x[1], reverse=True)
+        if not docs:
+            return []
         
-        return [doc for doc, score in scored_docs[:self.top_n]]
+        fused = np.zeros(len(docs))
+        for index_arr, weighted in fused_parts:
+            fused[index_arr] += weighted
+        order = np.argsort(-fused, kind="stable")
+        return [docs[i] for i in order]
+    
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        scored_lists = [
+            self._scored_documents(retriever, query, run_manager.get_child(tag=f"retriever_{i + 1}"))
+            for i, retriever in enumerate(self.retrievers)
+        ]
+        return self._fuse(scored_lists)
+    
+    async def _aget_relevant_documents(self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun) -> List[Document]:
+        # 벡터 검색의 임베딩 API 왕복과 BM25 점수 계산을 동시에 진행
+        scored_lists = await asyncio.gather(*[
+            self._ascored_documents(retriever, query, run_manager.get_child(tag=f"retriever_{i + 1}"))
+            for i, retriever in enumerate(self.retrievers)
+        ])
+        return self._fuse(list(scored_lists))
+
+
+def dedupe_documents(docs: List[Document]) -> List[Document]:
+    """doc_id 또는 본문이 앞서 나온 문서와 같으면 제거 (첫 등장 순서 유지)
+
+    doc_id가 달라도 본문이 같으면(다른 URL로 중복 수집된 글 등) 재랭킹 결과가 같으므로 함께 제거한다.
+    """
+    seen_ids = set()
+    seen_contents = set()
+    unique_docs = []
+    for doc in docs:
+        doc_id = (doc.metadata or {}).get("doc_id")
+        if (doc_id and doc_id in seen_ids) or doc.page_content in seen_contents:
+            continue
+        if doc_id:
+            seen_ids.add(doc_id)
+        seen_contents.add(doc.page_content)
+        unique_docs.append(doc)
+    return unique_docs
+
+
+class DedupCompressionRetriever(ContextualCompressionRetriever):
+    """중복 후보를 제거한 뒤 압축기(CrossEncoder 재랭킹)에 넘기는 ContextualCompressionRetriever
+
+    DBSF 융합은 doc_id로 이미 합치지만, FUSION_METHOD=rrf(EnsembleRetriever)는 본문으로 합치므로
+    직업명이 앞에 붙은 BM25 문서와 같은 문서의 벡터 검색 결과가 함께 남는다. 여기에 doc_id가 달라도
+    본문이 같은 후보까지 걸러 같은 내용을 CrossEncoder가 두 번 채점하지 않게 한다.
+    """
+    
+    def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun, **kwargs: Any) -> List[Document]:
+        docs = self.base_retriever.invoke(query, config={"callbacks": run_manager.get_child()}, **kwargs)
+        if not docs:
+            return []
+        compressed_docs = self.base_compressor.compress_documents(
+            dedupe_documents(docs), query, callbacks=run_manager.get_child()
+        )
+        return list(compressed_docs)
+    
+    async def _aget_relevant_documents(self, query: str, *, run_manager: AsyncCallbackManagerForRetrieverRun, **kwargs: Any) -> List[Document]:
+        docs = await self.base_retriever.ainvoke(query, config={"callbacks": run_manager.get_child()}, **kwargs)
+        if not docs:
+            return []
+        compressed_docs = await self.base_compressor.acompress_documents(
+            dedupe_documents(docs), query, callbacks=run_manager.get_child()
+        )
+        return list(compressed_docs)
@@ -1,60 +1,296 @@
 """
 RAG 시스템을 위한 검색기 초기화 유틸리티
 """
-from typing import List
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
 from langchain.docstore.document import Document
 from langchain_community.retrievers import BM25Retriever
 from langchain_community.cross_encoders import HuggingFaceCrossEncoder
 from langchain_chroma import Chroma
 from utils import get_logger
+from config import config
+from .retrievers import BM25SRetriever, faiss
+from .rerankers import OnnxInt8CrossEncoder, cpu_supports_bf16
+
+# FAISS HNSW 벡터 저장 형식 → ScalarQuantizer 타입 (flat은 float32 그대로 저장)
+_FAISS_QUANTIZERS = {"fp16": "QT_fp16", "8bit": "QT_8bit"}
+
+# 프로세스 단위 싱글톤 (같은 설정이면 모델/DB 연결을 다시 만들지 않음)
+_CROSS_ENCODERS: Dict[Tuple[str, str, int, int, int, str, bool], Any] = {}
+_EMBEDDING_FUNCTIONS: Dict[Tuple[str, str], Any] = {}
+_VECTORDBS: Dict[str, Chroma] = {}
 
 
 class SearcherFactory:
     """검색기 생성을 담당하는 팩토리 클래스"""
     
     @staticmethod
-    def create_bm25_data_from_vectordb(vectordb: Chroma) -> List[Document]:
-        """VectorDB에서 BM25용 데이터 추출"""
+    def _quality_suffix(meta: Optional[Dict]) -> str:
+        """품질 점수가 높은 문서에 붙이는 보조 토큰"""
+        try:
+            return "\n추천문서" if float(meta.get("quality_score", 0.0)) > 3.0 else ""
+        except (ValueError, TypeError):
+            return ""
+    
+    @staticmethod
+    def create_bm25_corpus_from_vectordb(vectordb: Chroma) -> Tuple[List[str], List[Dict]]:
+        """VectorDB에서 BM25용 (강화 텍스트, 메타데이터) 리스트 추출
+
+        직업명은 1회만 앞에 붙여 BM25 토큰에 확실히 포함시키고,
+        품질 점수는 "추천문서" 토큰으로 보조적으로만 반영한다.
+        본문이 완전히 같은 문서는 첫 문서만 남겨 포스팅 중복과 IDF 왜곡을 막는다.
+        """
         logger = get_logger(__name__)
         logger.info("🔄 VectorDB에서 BM25용 데이터 추출 중...")
         
         store_data = vectordb.get(include=["documents", "metadatas"])
-        docs_for_bm25 = []
-        
+        texts: List[str] = []
+        metadatas: List[Dict] = []
+        seen = set()
         for txt, meta in zip(store_data["documents"], store_data["metadatas"]):
-            enhanced_content = txt
-            
-            # 메타데이터로 컨텐츠 강화 (직업 정보 중심)
-            if meta:
-                # 직업 정보 강화 (가장 중요)
-                if class_name := meta.get("class_name"):
-                    # 직업명 1회만 prepend 해서 BM25 토큰에 확실히 포함시키기
-                    enhanced_content = f"{class_name}\n{enhanced_content}"
-                
-                # 품질 점수는 보조적으로만 사용
-                try:
-                    quality_score = float(meta.get("quality_score", 0.0))
-                    if quality_score > 3.0:  # 고품질 문서
-                        enhanced_content += "\n추천문서"
-                except (ValueError, TypeError):
-                    pass
-            
-            docs_for_bm25.append(Document(page_content=enhanced_content, metadata=meta))
-        
-        logger.info(f"✅ BM25용 문서 {len(docs_for_bm25)}개 준비 완료")
-        return docs_for_bm25
-    
-    @staticmethod
-    def create_bm25_retriever(docs_for_bm25: List[Document], k: int = 25) -> BM25Retriever:
-        """BM25 검색기 생성"""
+            if txt in seen:
+                continue
+            seen.add(txt)
+            texts.append(txt)
+            metadatas.append(meta or {})
+        if duplicates := len(store_data["documents"]) - len(texts):
+            logger.info(f"🧹 본문 중복 문서 {duplicates}개 제외")
+        
+        class_names = [meta.get("class_name") for meta in metadatas]
+        suffixes = [SearcherFactory._quality_suffix(meta) for meta in metadatas]
+        enhanced = [
+            f"{class_name}\n{txt}{suffix}" if class_name else f"{txt}{suffix}"
+            for txt, class_name, suffix in zip(texts, class_names, suffixes)
+        ]
+        
+        logger.info(f"✅ BM25용 문서 {len(enhanced)}개 준비 완료")
+        return enhanced, metadatas
+    
+    @staticmethod
+    def create_bm25_data_from_vectordb(vectordb: Chroma) -> List[Document]:
+        """VectorDB에서 BM25용 데이터 추출 (rank_bm25 BM25Retriever용 Document 리스트)"""
+        texts, metadatas = SearcherFactory.create_bm25_corpus_from_vectordb(vectordb)
+        return [Document(page_content=txt, metadata=meta) for txt, meta in zip(texts, metadatas)]
+    
+    @staticmethod
+    def create_bm25_retriever(docs_for_bm25: List[Document], k: int = 25):
+        """BM25 검색기 생성 (bm25s 설치 시 BM25SRetriever, 아니면 rank_bm25 기반 BM25Retriever)"""
+        if BM25SRetriever.is_available():
+            return BM25SRetriever.from_documents(docs_for_bm25, k=k, backend=config.BM25_BACKEND)
+        
         bm25_retriever = BM25Retriever.from_documents(docs_for_bm25)
         bm25_retriever.k = k
         return bm25_retriever
     
     @staticmethod
-    def create_cross_encoder_model(model_name: str = "cross-encoder/ms-marco-MiniLM-L6-v2") -> HuggingFaceCrossEncoder:
-        """CrossEncoder 모델 생성"""
-        return HuggingFaceCrossEncoder(
+    def _faiss_index_kind(index) -> str:
+        """FAISS 인덱스의 벡터 저장 형식 (flat | fp16 | 8bit | 기타 클래스명)"""
+        if isinstance(index, faiss.IndexHNSWSQ):
+            qtype = faiss.downcast_index(index.storage).sq.qtype
+            for kind, qt_name in _FAISS_QUANTIZERS.items():
+                if qtype == getattr(faiss.ScalarQuantizer, qt_name):
+                    return kind
+        if isinstance(index, faiss.IndexHNSWFlat):
+            return "flat"
+        return type(index).__name__
+    
+    @staticmethod
+    def build_faiss_index(vectordb: Chroma, index_path: Path, m: int = 32, ef_construction: int = 200,
+                          ef_search: int = 64, quantizer: str = "fp16") -> Tuple[object, List[str]]:
+        """Chroma 임베딩으로 FAISS HNSW(내적) 인덱스 생성 후 저장
+
+        quantizer가 fp16/8bit면 벡터를 스칼라 양자화(IndexHNSWSQ)해 저장하므로 그래프 탐색 시
+        읽는 메모리가 float32의 1/2, 1/4로 줄어든다.
+        인덱스는 index_path에, 행 번호 → 문서 ID 매핑은 같은 이름의 .ids.json에 저장한다.
+        """
+        logger = get_logger(__name__)
+        logger.info(f"🔄 VectorDB 임베딩으로 FAISS HNSW 인덱스 생성 중... (벡터 형식: {quantizer})")
+        
+        store_data = vectordb.get(include=["embeddings"])
+        ids = list(store_data["ids"])
+        embeddings = np.ascontiguousarray(store_data["embeddings"], dtype="float32")
+        if embeddings.ndim != 2 or len(ids) == 0:
+            raise ValueError("FAISS 인덱스를 만들 임베딩이 없습니다")
+        
+        # 정규화 후 내적 = 코사인 유사도
+        faiss.normalize_L2(embeddings)
+        dim = embeddings.shape[1]
+        if quantizer in _FAISS_QUANTIZERS:
+            qtype = getattr(faiss.ScalarQuantizer, _FAISS_QUANTIZERS[quantizer])
+            index = faiss.IndexHNSWSQ(dim, qtype, m, faiss.METRIC_INNER_PRODUCT)
+        else:
+            index = faiss.IndexHNSWFlat(dim, m, faiss.METRIC_INNER_PRODUCT)
+        index.hnsw.efConstruction = ef_construction
+        # 8bit는 차원별 min/max 학습 필요 (flat/fp16은 학습 없이 바로 추가됨)
+        index.train(embeddings)
+        index.add(embeddings)
+        
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        faiss.write_index(index, str(index_path))
+        index.hnsw.efSearch = ef_search
+        with index_path.with_suffix(".ids.json").open("w", encoding="utf-8") as f:
+            json.dump(ids, f, ensure_ascii=False)
+        
+        logger.info(f"✅ FAISS 인덱스 저장 완료: {index_path} ({len(ids)}개 벡터)")
+        return index, ids
+    
+    @staticmethod
+    def load_faiss_index(index_path: Path, expected_ids: List[str], ef_search: int = 64,
+                         quantizer: str = "fp16") -> Optional[Tuple[object, List[str]]]:
+        """저장된 FAISS 인덱스 로드 (없거나 VectorDB 문서 ID 집합/벡터 형식이 다르면 None)
+
+        문서 수가 같아도 컬렉션을 다시 만들면 ID가 바뀌므로 .ids.json과 VectorDB ID를 비교한다.
+        """
+        logger = get_logger(__name__)
+        ids_path = index_path.with_suffix(".ids.json")
+        if not index_path.exists() or not ids_path.exists():
+            return None
+        try:
+            index = faiss.read_index(str(index_path))
+            with ids_path.open("r", encoding="utf-8") as f:
+                ids = json.load(f)
+        except Exception as e:
+            logger.warning(f"⚠️ FAISS 인덱스 로드 실패 ({index_path}): {e}")
+            return None
+        if index.ntotal != len(expected_ids) or len(ids) != index.ntotal:
+            logger.info(f"🔄 FAISS 인덱스가 VectorDB와 다름 ({index.ntotal} != {len(expected_ids)})")
+            return None
+        if set(ids) != set(expected_ids):
+            logger.info("🔄 FAISS 인덱스 문서 ID가 VectorDB와 다름")
+            return None
+        expected_kind = quantizer if quantizer in _FAISS_QUANTIZERS else "flat"
+        index_kind = SearcherFactory._faiss_index_kind(index)
+        if index_kind != expected_kind:
+            logger.info(f"🔄 FAISS 인덱스 벡터 형식 변경 ({index_kind} → {expected_kind})")
+            return None
+        index.hnsw.efSearch = ef_search
+        return index, ids
+    
+    @staticmethod
+    def load_class_rows(store_data: Dict[str, List], ids: List[str]) -> Dict[str, np.ndarray]:
+        """FAISS 행 번호를 문서의 소문자 직업명(class_name, 없으면 "")별로 묶음
+
+        store_data는 vectordb.get(include=["metadatas"]) 결과 (인덱스 검증과 한 번의 조회를 공유).
+        """
+        class_by_id = {
+            doc_id: str((meta or {}).get("class_name") or "").lower()
+            for doc_id, meta in zip(store_data["ids"], store_data["metadatas"])
+        }
+        grouped: Dict[str, List[int]] = {}
+        for row, doc_id in enumerate(ids):
+            grouped.setdefault(class_by_id.get(doc_id, ""), []).append(row)
+        return {class_name: np.asarray(rows, dtype="int64") for class_name, rows in grouped.items()}
+    
+    @staticmethod
+    def get_embedding_function():
+        """임베딩 함수 싱글톤 (EMBEDDING_TYPE, EMBED_MODEL_NAME 기준)"""
+        key = (config.EMBEDDING_TYPE, config.EMBED_MODEL_NAME)
+        if key not in _EMBEDDING_FUNCTIONS:
+            _EMBEDDING_FUNCTIONS[key] = config.create_embedding_function()
+        return _EMBEDDING_FUNCTIONS[key]
+    
+    @staticmethod
+    def get_vectordb(persist_directory: str, embedding_fn) -> Chroma:
+        """Chroma 연결 싱글톤 (persist_directory 기준)"""
+        if persist_directory not in _VECTORDBS:
+            _VECTORDBS[persist_directory] = Chroma(
+                persist_directory=persist_directory,
+                embedding_function=embedding_fn
+            )
+        return _VECTORDBS[persist_directory]
+    
+    @staticmethod
+    def get_cross_encoder_model(model_name: str, device: str = "cpu",
+                                batch_size: int = 0, max_length: int = 256, cpu_threads: int = 0,
+                                backend: str = "torch", cache_dir: Optional[Path] = None,
+                                cpu_bf16: bool = False):
+        """CrossEncoder 싱글톤 (pickle 없이 HuggingFace 캐시에서 로드)
+
+        backend="onnx"이고 CPU이면 ONNX Runtime int8 양자화 모델을 사용한다 (cache_dir에 저장).
+        """
+        logger = get_logger(__name__)
+        use_onnx = backend == "onnx" and device == "cpu"
+        if use_onnx and not OnnxInt8CrossEncoder.is_available():
+            logger.warning("⚠️ optimum[onnxruntime] 미설치 - PyTorch CrossEncoder 사용")
+            use_onnx = False
+        
+        key = (model_name, device, batch_size, max_length, cpu_threads, "onnx" if use_onnx else "torch", cpu_bf16)
+        if key in _CROSS_ENCODERS:
+            return _CROSS_ENCODERS[key]
+        
+        if use_onnx:
+            model_dir = (cache_dir or Path(config.CACHE_DIR)) / "cross_encoder_int8" / model_name.replace("/", "__")
+            try:
+                model = OnnxInt8CrossEncoder(
+                    model_name, model_dir, batch_size=batch_size, max_length=max_length, cpu_threads=cpu_threads
+                )
+                logger.info(f"✅ CrossEncoder 로드: {model_name} (ONNX int8, batch_size={batch_size}, "
+                            f"max_length={max_length})")
+                _CROSS_ENCODERS[key] = model
+                return model
+            except Exception as e:
+                logger.warning(f"⚠️ ONNX CrossEncoder 준비 실패, PyTorch 사용: {e}")
+        
+        _CROSS_ENCODERS[key] = SearcherFactory.create_cross_encoder_model(
+            model_name, device=device, batch_size=batch_size, max_length=max_length, cpu_threads=cpu_threads,
+            cpu_bf16=cpu_bf16,
+        )
+        return _CROSS_ENCODERS[key]
+    
+    @staticmethod
+    def create_cross_encoder_model(model_name: str = "cross-encoder/ms-marco-MiniLM-L6-v2",
+                                   device: str = "cpu",
+                                   batch_size: int = 0,
+                                   max_length: int = 256,
+                                   cpu_threads: int = 0,
+                                   cpu_bf16: bool = False) -> HuggingFaceCrossEncoder:
+        """CrossEncoder 모델 생성 (CUDA면 fp16, CPU면 스레드 수 제한 및 bf16 가능)"""
+        logger = get_logger(__name__)
+        
+        if device == "cpu" and cpu_threads > 0:
+            # 여러 워커 프로세스가 각자 전체 코어를 쓰며 경합하는 것을 방지
+            import torch
+            torch.set_num_threads(cpu_threads)
+        
+        model = BatchedCrossEncoder(
             model_name=model_name, 
-            model_kwargs={"device": "cpu"}
+            model_kwargs={"device": device, "max_length": max_length},
+            batch_size=batch_size,
         )
+        dtype = ""
+        if device.startswith("cuda"):
+            model.client.model.half()
+            dtype = ", fp16"
+        elif device == "cpu" and cpu_bf16:
+            # 네이티브 BF16 지원 CPU에서만 변환 (가중치 절반, AVX512-BF16/AMX GEMM 사용)
+            if cpu_supports_bf16():
+                import torch
+                model.client.model.to(torch.bfloat16)
+                dtype = ", bf16"
+            else:
+                logger.debug("CPU가 BF16을 네이티브로 지원하지 않음 - fp32 유지")
+        logger.info(f"✅ CrossEncoder 로드: {model_name} (device={device}, batch_size={batch_size}, "
+                    f"max_length={max_length}{dtype})")
+        return model
+
+
+class BatchedCrossEncoder(HuggingFaceCrossEncoder):
+    """모든 (쿼리, 문서) 쌍을 predict() 한 번에 batch_size 단위로 점수화하는 CrossEncoder
+
+    batch_size가 0 이하면 후보 전체를 한 배치로 처리한다.
+    """
+    
+    batch_size: int = 0
+    
+    def score(self, text_pairs: List[Tuple[str, str]]) -> List[float]:
+        batch_size = self.batch_size if self.batch_size > 0 else max(1, len(text_pairs))
+        # fp16/bf16 텐서는 numpy로 바로 변환되지 않으므로 float32로 올린 뒤 변환
+        scores = self.client.predict(
+            text_pairs, batch_size=batch_size, convert_to_tensor=True, show_progress_bar=False
+        ).float().cpu().numpy()
+        # 일부 모델은 (무관, 관련) 두 점수를 반환하므로 관련 점수만 사용
+        if len(scores.shape) > 1:
+            return scores[:, 1]
+        return scores
@@ -4,24 +4,26 @@
 from __future__ import annotations
 import os
 import time
-from typing import Dict, List, Optional, Any
+from collections import deque
+from typing import Any, AsyncIterator, Dict, List, Optional
 from pathlib import Path
 
-# LLM & 임베딩
-from langchain_chroma import Chroma
-
 # Google Gemini SDK for grounding
 from google import genai
+from google.genai.types import HttpOptions
 
 # 검색 관련
-from langchain.retrievers import EnsembleRetriever, ContextualCompressionRetriever
+from langchain.retrievers import EnsembleRetriever
+from langchain_core.retrievers import BaseRetriever
 from langchain.retrievers.document_compressors import CrossEncoderReranker
 from langchain.prompts import PromptTemplate
 
 # 분리된 유틸리티들
-from .cache_utils import CacheManager
+from .cache_utils import CacheManager, QueryEmbeddingMemo, SemanticQueryCache, prewarm_paths
 from .text_utils import TextProcessor
-from .retrievers import MetadataAwareRetriever
+from .retrievers import (
+    BM25SRetriever, DBSFRetriever, DedupCompressionRetriever, FaissMMRRetriever, MetadataAwareRetriever
+)
 from .search_factory import SearcherFactory
 from utils import get_logger
 from config import config  # 중앙화된 설정 사용
@@ -44,14 +46,30 @@ class StructuredRAGService:
         self.enable_web_grounding = config.ENABLE_WEB_GROUNDING
         self.cache_expiry_short = config.CACHE_EXPIRY_SHORT
         self.cache_expiry_long = config.CACHE_EXPIRY_LONG
+        self.fusion_method = config.FUSION_METHOD.lower()
+        self.bm25_weight = config.HYBRID_BM25_WEIGHT
+        self.search_k = config.SEARCH_K
+        # 지연시간 기준으로 현재 사용 중인 후보 수 (요청마다 이 값으로 검색기 사본을 만듦)
+        self._active_search_k = self.search_k
+        # 최근 검색(캐시 미적중) 소요시간 - p95가 예산을 넘으면 후보 수를 줄여 재랭킹 비용을 낮춤
+        self._search_latencies = deque(maxlen=max(0, config.SEARCH_LATENCY_WINDOW))
         
         # 캐시 파일명들
         self.bm25_cache_file = "bm25_retriever.pkl"
-        self.cross_encoder_cache_file = "cross_encoder.pkl"
+        # 토큰화 규칙이 바뀌면 버전을 올려 이전 인덱스를 재사용하지 않도록 함 (v2: 한 글자 토큰 포함)
+        self.bm25s_index_dir = "bm25s_index_v2"
         
         start_time = time.time()
         
         self._setup_environment()
+        # 모델 로딩과 병행해 인덱스/DB 파일을 페이지 캐시에 미리 올림
+        prewarm_paths([
+            self.cache_dir / self.bm25s_index_dir,
+            self.cache_dir / self.bm25_cache_file,
+            self.cache_dir / "search_cache.db",
+            Path(self.vector_db_dir),
+            Path(config.VECTOR_INDEX_PATH),
+        ])
         self._initialize_utilities()
         self._initialize_core_components()
         self._initialize_retrievers()
@@ -85,6 +103,13 @@ class StructuredRAGService:
             self.cache_expiry_short, 
             self.cache_expiry_long
         )
+        self.cache_manager.warm_memory_cache()
+        # 표현만 다른 같은 질문용 의미 캐시 (프로세스 메모리)
+        self.semantic_cache = SemanticQueryCache(
+            self.cache_expiry_short,
+            max_entries=config.SEMANTIC_CACHE_MAX_ENTRIES,
+            max_distance=config.SEMANTIC_CACHE_MAX_DISTANCE,
+        ) if config.SEMANTIC_CACHE_ENABLED else None
         self.text_processor = TextProcessor()
         self.search_factory = SearcherFactory()
         
@@ -97,7 +122,7 @@ class StructuredRAGService:
         # Grounding을 위한 Google SDK 초기화
         self.logger.info("Google GenAI SDK 사용 - 웹 검색 그라운딩 지원")
         try:
-            self.genai_client = genai.Client(api_key=self.gemini_api_key)
+            self.genai_client = self._create_genai_client()
             self.logger.debug("Google GenAI 클라이언트 초기화 성공")
         except Exception as e:
             self.logger.error(f"Google GenAI 클라이언트 초기화 실패: {e}")
@@ -111,7 +136,9 @@ class StructuredRAGService:
         self.logger.info(f"임베딩 모델 로드: {self.embed_model_name} (타입: {embedding_type})")
         
         try:
-            self.embedding_fn = config.create_embedding_function()
+            self.embedding_fn = self.search_factory.get_embedding_function()
+            # 같은 쿼리의 임베딩은 의미 캐시 조회/벡터 검색/재시도에서 한 번만 계산
+            self.query_embedder = QueryEmbeddingMemo(self.embedding_fn, max_size=config.QUERY_EMBEDDING_CACHE_SIZE)
             self.logger.debug(f"임베딩 모델 로드 성공 ({embedding_type})")
         except Exception as e:
             self.logger.error(f"임베딩 모델 로드 실패: {e}")
@@ -119,10 +146,7 @@ class StructuredRAGService:
         
         # 벡터 DB 초기화
         try:
-            self.vectordb = Chroma(
-                persist_directory=self.vector_db_dir,
-                embedding_function=self.embedding_fn
-            )
+            self.vectordb = self.search_factory.get_vectordb(self.vector_db_dir, self.query_embedder)
             self.logger.info(f"벡터 DB 연결 성공: {self.vector_db_dir}")
         except Exception as e:
             self.logger.error(f"벡터 DB 연결 실패: {e}")
@@ -138,19 +162,20 @@ class StructuredRAGService:
         start_time = time.time()
         
         # 벡터 검색기 설정
-        self.vector_retriever = self.vectordb.as_retriever(
-            search_type="mmr",
-            search_kwargs={"k": 25, "fetch_k": 100, "lambda_mult": 0.5},
-        )
+        self.vector_retriever = self._get_vector_retriever()
         self.logger.debug("벡터 검색기 설정 완료")
         
         # BM25 검색기 생성 (캐시 사용)
         self.bm25_retriever = self._get_bm25_retriever()
+        self.bm25_retriever.k = self.search_k  # 캐시에서 읽은 검색기에도 현재 설정 적용
+        if isinstance(self.bm25_retriever, BM25SRetriever):
+            # numba 백엔드면 첫 사용자 쿼리 대신 시작 시점에 JIT 컴파일
+            self.logger.debug(f"BM25 검색 커널 예열 완료 ({self.bm25_retriever.warmup():.2f}초)")
         self.logger.debug("BM25 검색기 로드 완료")
         
         # 앙상블 검색기 생성 - 기본 설정
         # 동적 가중치는 rag_search에서 처리
-        self.rrf_retriever = None  # 나중에 동적으로 생성
+        self.hybrid_retriever = None  # 나중에 동적으로 생성
         
         # CrossEncoder 모델만 미리 로드
         self.cross_encoder_model = self._get_cross_encoder_model()
@@ -164,9 +189,9 @@ class StructuredRAGService:
 
     def _setup_llm_and_prompt(self):
         """LLM 및 프롬프트 설정 (던파 전문가 버전)"""
-        self.prompt = PromptTemplate(
-            input_variables=["internal_context", "question", "character_info", "conversation_history"],
-            template="""
+        # 고정 지침은 system_instruction으로 분리 - 요청마다 같은 접두부라 서버 측 프롬프트 캐싱 대상이 되고,
+        # 지침 안에 검색 결과/캐릭터 정보/대화 기록을 다시 끼워 넣지 않아 입력 토큰도 줄어든다
+        self.system_instruction = """
 당신은 'RPGPT 던파'의 "던파 최고의 네비게이터" AI 챗봇입니다. 
 당신의 핵심 임무는 사용자의 던전앤파이터 캐릭터 성장 및 게임 플레이에 관한 질문에 대해, 가장 정확하고 효율적인 답변을 제공하는 것입니다.
 현재 날짜는 2025년 6월 3일입니다. 이 날짜를 기준으로 최신 정보를 제공해야 합니다.
@@ -175,15 +200,15 @@ class StructuredRAGService:
 
 1.  **정보 처리 및 활용 전략:**
     *   **정보 출처 우선순위:**
-        1.  **[내부 데이터베이스 검색 결과] ({internal_context}):** 제공된 내부 정보를 최우선으로 사용합니다. 정보 간 충돌이 발생할 경우, 가장 최신 버전(버전 정보 또는 날짜 기준)의 정보를 채택합니다.
+        1.  **[내부 데이터베이스 검색 결과]:** 제공된 내부 정보를 최우선으로 사용합니다. 정보 간 충돌이 발생할 경우, 가장 최신 버전(버전 정보 또는 날짜 기준)의 정보를 채택합니다.
         2.  **[웹 검색 (Grounding)]:** 내부 정보가 없거나 부족할 때, 최신 정보(예: 긴급/주간 패치 노트, 신규 이벤트, 아이템 시세 변동 등)가 필요하다고 판단될 때, 또는 사용자가 명시적으로 최신 정보를 요구할 경우에만 활용합니다.
             *   **웹 검색 시:** "2025년", "최신", "[현재 시즌명]", "[최신 패치명]" 등의 키워드를 적극 활용하여 정보의 최신성을 확보합니다. (예: "2025년 블레이드 스킬트리", "던파 최신 이벤트 목록")
             *   **신뢰할 수 있는 출처:** 공식 홈페이지(df.nexon.com), 주요 커뮤니티(예: 디시 던파IP갤, 아카라이브 던파채널), 공인된 공략 사이트, 게임 전문 매체의 정보를 우선적으로 참고합니다. 커뮤니티 정보는 교차 확인을 통해 신뢰도를 높입니다.
             *   **정보 통합:** 웹 검색 결과는 내부 정보와 비교/검증 후, 가장 정확하고 최신이며 신뢰도 높은 정보를 선택하여 답변에 반영합니다. 핵심 내용 위주로 간결하게 요약하여 전달합니다.
-    *   **[캐릭터 정보] ({character_info}) 활용:**
+    *   **[캐릭터 정보] 활용:**
         *   사용자의 질문이 캐릭터의 성장, 스펙(장비, 스킬, 아바타 등), 특정 콘텐츠 공략 등 **캐릭터와 직접적으로 관련된 경우**, 제공된 캐릭터 정보를 적극 활용하여 맞춤형 답변을 제공합니다.
         *   질문이 **일반적인 게임 정보**(예: 최신 업데이트 내용 전반, 모든 직업 공통 이벤트, 특정 아이템의 일반적인 성능 및 획득처 등)에 관한 것이라면, 캐릭터 정보에 얽매이지 않고 가장 적절하고 일반적인 정보를 제공합니다. 캐릭터 정보가 답변에 불필요하다고 판단되면 무시해도 좋습니다.
-    *   **[이전 대화 기록] ({conversation_history}):** 이전 대화의 맥락을 파악하는 데 참고하되, 항상 현재 사용자의 질문에 집중하여 답변합니다. 이전 대화가 현재 질문과 무관하다면 고려하지 않아도 됩니다.
+    *   **[이전 대화 기록]:** 이전 대화의 맥락을 파악하는 데 참고하되, 항상 현재 사용자의 질문에 집중하여 답변합니다. 이전 대화가 현재 질문과 무관하다면 고려하지 않아도 됩니다.
 
 2.  **답변 생성 원칙:**
     *   **페르소나 및 어투:
@@ -220,7 +245,10 @@ class StructuredRAGService:
     *   제공된 [내부 데이터베이스 검색 결과] 및 [웹 검색 (Grounding)] 결과 이외의 정보를 임의로 사용하거나, 사실이 아닌 내용을 추측하여 꾸며내지 않습니다 (환각 현상 절대 금지).
     *   개인적인 의견, 주관적인 판단, 선호도를 배제하고 항상 객관적인 정보만을 전달합니다.
     *   **가장 중요: 사용자가 명시적으로 질문하지 않은 내용에 대해 선제적으로 상세 정보를 제공하거나 설명을 확장하는 행위를 절대 금지합니다. 항상 질문의 범위 내에서만 답변하십시오.**
-
+"""
+        self.prompt = PromptTemplate(
+            input_variables=["internal_context", "question", "character_info", "conversation_history"],
+            template="""
 [입력 정보]
 캐릭터 정보: {character_info}
 이전 대화 기록: {conversation_history}
@@ -230,10 +258,72 @@ class StructuredRAGService:
 [답변 - 사용자의 질문 의도에 정확히 부합하도록, 위의 모든 지침을 철저히 준수하여 간결하고 명확하게 작성]
 """
         )
+        # 고정 템플릿이므로 요청마다 PromptTemplate 검증/파싱을 거치지 않고 str.format_map 직접 사용
+        self._render_prompt = self.prompt.template.format_map
         self.logger.debug("✅ LLM 프롬프트 설정 완료")
 
+    def _create_genai_client(self):
+        """GenAI 클라이언트 생성 (서비스 수명 동안 하나의 연결 풀을 재사용)
+
+        요청 사이 유휴 시간에도 keep-alive 연결을 유지해 매 질문마다 TLS 핸드셰이크를 하지 않는다.
+        h2가 설치되어 있으면 HTTP/2로 한 연결에서 동시 요청을 처리한다.
+        """
+        client_args = config.http_client_args()
+        try:
+            http_options = HttpOptions(client_args=client_args, async_client_args=client_args)
+        except Exception as e:
+            # client_args를 지원하지 않는 SDK 버전이면 기본 연결 풀 사용
+            self.logger.warning(f"⚠️ GenAI HTTP 연결 설정 미지원, 기본값 사용: {e}")
+            return genai.Client(api_key=self.gemini_api_key)
+        return genai.Client(api_key=self.gemini_api_key, http_options=http_options)
+
+    def _get_vector_retriever(self):
+        """벡터 검색기 생성 (faiss 설치 시 HNSW 인덱스 + NumPy MMR/유사도, 아니면 Chroma)"""
+        use_mmr = config.VECTOR_SEARCH_TYPE.lower() == "mmr"
+        search_kwargs = {"k": self.search_k}
+        if use_mmr:
+            search_kwargs.update(fetch_k=100, lambda_mult=0.5)
+        
+        if FaissMMRRetriever.is_available():
+            index_path = Path(config.VECTOR_INDEX_PATH)
+            try:
+                # 인덱스 검증용 문서 ID (직업 필터를 쓰면 메타데이터도 한 번에 조회)
+                store_data = self.vectordb.get(include=["metadatas"] if config.VECTOR_CLASS_FILTER else [])
+                quantizer = config.VECTOR_INDEX_QUANTIZER.lower()
+                loaded = self.search_factory.load_faiss_index(index_path, store_data["ids"], quantizer=quantizer)
+                if loaded is None:
+                    loaded = self.search_factory.build_faiss_index(self.vectordb, index_path, quantizer=quantizer)
+                index, ids = loaded
+                self.logger.info(f"✅ FAISS 벡터 검색기 사용: {index_path} ({index.ntotal}개 벡터)")
+                # 쿼리의 직업으로 후보 탐색 범위를 좁히기 위한 직업별 행 번호
+                class_rows = (
+                    self.search_factory.load_class_rows(store_data, ids) if config.VECTOR_CLASS_FILTER else None
+                )
+                return FaissMMRRetriever(
+                    index=index, ids=ids, vectordb=self.vectordb,
+                    embedding_fn=self.query_embedder, use_mmr=use_mmr, class_rows=class_rows, **search_kwargs
+                )
+            except Exception as e:
+                self.logger.warning(f"⚠️ FAISS 인덱스 준비 실패, Chroma 검색 사용: {e}")
+        
+        return self.vectordb.as_retriever(
+            search_type="mmr" if use_mmr else "similarity", search_kwargs=search_kwargs
+        )
+
     def _get_bm25_retriever(self):
         """BM25 검색기 생성 (캐시 활용)"""
+        if BM25SRetriever.is_available():
+            # bm25s 인덱스는 pickle 대신 배열 파일 디렉토리로 저장하고 mmap으로 연다
+            def create_bm25s_retriever():
+                texts, metadatas = self.search_factory.create_bm25_corpus_from_vectordb(self.vectordb)
+                return BM25SRetriever.from_texts(texts, metadatas, backend=config.BM25_BACKEND)
+            
+            return self.cache_manager.load_or_create_cached_item(
+                self.bm25s_index_dir, create_bm25s_retriever, self.cache_expiry_short, "bm25s 인덱스",
+                load_func=lambda path: BM25SRetriever.load(path, mmap=True, backend=config.BM25_BACKEND),
+                save_func=lambda retriever, path: retriever.save(path),
+            )
+        
         def creation_func():
             docs_for_bm25 = self.search_factory.create_bm25_data_from_vectordb(self.vectordb)
             return self.search_factory.create_bm25_retriever(docs_for_bm25)
@@ -243,12 +333,16 @@ class StructuredRAGService:
         )
 
     def _get_cross_encoder_model(self):
-        """CrossEncoder 모델 생성 (캐시 활용)"""
-        def creation_func():
-            return self.search_factory.create_cross_encoder_model(self.cross_encoder_model_hf)
-        
-        return self.cache_manager.load_or_create_cached_item(
-            self.cross_encoder_cache_file, creation_func, self.cache_expiry_long, "CrossEncoder 모델"
+        """CrossEncoder 모델 로드 (가중치는 HuggingFace 캐시, 인스턴스는 프로세스 싱글톤)"""
+        return self.search_factory.get_cross_encoder_model(
+            self.cross_encoder_model_hf,
+            device=config.get_device(),
+            batch_size=config.CROSS_ENCODER_BATCH_SIZE,
+            max_length=config.CROSS_ENCODER_MAX_LENGTH,
+            cpu_threads=config.CROSS_ENCODER_CPU_THREADS,
+            backend=config.CROSS_ENCODER_BACKEND.lower(),
+            cache_dir=self.cache_dir,
+            cpu_bf16=config.CROSS_ENCODER_CPU_BF16,
         )
     
     def _determine_weights(self, query: str, character_info: Optional[Dict]) -> List[float]:
@@ -256,11 +350,11 @@ class StructuredRAGService:
         query_lower = query.lower()
 
         # 기본값: BM25 우선 (직업도, 캐릭터 정보도 이미 갖고 있음)
-        weights = [0.3, 0.7]
+        weights = [1.0 - self.bm25_weight, self.bm25_weight]
 
         # “최신·업데이트” 류 키워리면 벡터 가중치로 스왑
         if any(k in query_lower for k in ["최신", "업데이트", "현재", "패치", "종결"]):
-            weights = [0.7, 0.3]
+            weights = weights[::-1]
             self.logger.debug("🔄 최신·패치 관련 키워드 감지 → 벡터 가중치 증가")
 
         return weights
@@ -282,54 +376,119 @@ class StructuredRAGService:
         
         return "\n".join(context_parts) if context_parts else "이전 대화 기록이 없습니다."
 
-    def rag_search(self, query: str, character_info: Optional[Dict]) -> Dict[str, Any]:
-        # 캐시 확인
-        cached_result = self.cache_manager.get_cached_search_result(query, 'rag_search', character_info)
-        if cached_result:
-            self.logger.debug("🔄 캐시된 RAG 검색 결과 사용")
-            return cached_result
+    def _choose_search_k(self) -> int:
+        """최근 검색 지연시간 p95 기준으로 검색기별 후보 수 결정
+
+        p95가 예산을 넘으면 축소값을 쓰고, 예산의 절반 아래로 내려와야 원래 값으로 되돌린다
+        (축소 직후 빨라진 검색 때문에 두 값 사이를 오가지 않도록).
+        SEARCH_LATENCY_BUDGET 또는 SEARCH_LATENCY_WINDOW가 0 이하면 조정하지 않는다.
+        """
+        budget = config.SEARCH_LATENCY_BUDGET
+        window = self._search_latencies.maxlen
+        current_k = self._active_search_k
+        k = current_k
+        if budget > 0 and window > 0 and len(self._search_latencies) >= max(1, window // 2):
+            latencies = sorted(self._search_latencies)
+            p95 = latencies[int(0.95 * (len(latencies) - 1))]
+            if p95 > budget:
+                k = min(config.SEARCH_K_REDUCED, self.search_k)
+            elif p95 < budget * 0.5:
+                k = self.search_k
+        
+        if k != current_k:
+            self.logger.info(f"⏱️ 검색 후보 수 변경: {current_k} → {k} (지연시간 예산 {budget}초)")
+            self._active_search_k = k
+        return k
+
+    def _retrievers_for_k(self, k: int) -> List[BaseRetriever]:
+        """후보 수 k로 검색하는 벡터/BM25 검색기 (공유 검색기는 바꾸지 않고 요청별 사본 사용)"""
+        if k == self.search_k:
+            return [self.vector_retriever, self.bm25_retriever]
+        if isinstance(self.vector_retriever, FaissMMRRetriever):
+            vector_retriever = self.vector_retriever.model_copy(update={"k": k})
+        else:
+            vector_retriever = self.vector_retriever.model_copy(
+                update={"search_kwargs": {**self.vector_retriever.search_kwargs, "k": k}}
+            )
+        return [vector_retriever, self.bm25_retriever.model_copy(update={"k": k})]
+
+    def _build_internal_retriever(self, query: str, character_info: Optional[Dict], search_k: int) -> MetadataAwareRetriever:
+        """쿼리별 가중치로 하이브리드 검색 → CrossEncoder 재랭킹 → 메타데이터 스코어링 검색기 생성"""
 
-        search_start_time = time.time()
-        # 캐릭터 정보로 쿼리 강화
-        enhanced_query = self.text_processor.enhance_query_with_character(query, character_info)
-        times = {"internal_search": 0.0}
-        
         # 동적 가중치 설정
         weights = self._determine_weights(query, character_info)
         self.logger.debug(f"🎯 앙상블 가중치: 벡터={weights[0]:.2f}, BM25={weights[1]:.2f}")
         
-        # 앙상블 검색기 동적 생성
-        self.rrf_retriever = EnsembleRetriever(
-            retrievers=[self.vector_retriever, self.bm25_retriever],
+        # 앙상블 검색기 동적 생성 (기본 DBSF 점수 융합, FUSION_METHOD=rrf면 기존 RRF)
+        retriever_cls = EnsembleRetriever if self.fusion_method == "rrf" else DBSFRetriever
+        hybrid_retriever = retriever_cls(
+            retrievers=self._retrievers_for_k(search_k),
             weights=weights,
         )
         
-        # CrossEncoder 재랭킹 추가
+        # CrossEncoder 재랭킹 추가 (중복 후보는 재랭킹 전에 제거)
         compressor = CrossEncoderReranker(model=self.cross_encoder_model, top_n=40)
-        base_retriever = ContextualCompressionRetriever(
-            base_retriever=self.rrf_retriever,
+        base_retriever = DedupCompressionRetriever(
+            base_retriever=hybrid_retriever,
             base_compressor=compressor,
         )
         
         # 메타데이터 인식 검색기로 래핑
-        self.internal_retriever = MetadataAwareRetriever(base_retriever)
-
-        def _search_internal():
-            start = time.time()
-            try:
-                self.logger.debug("🔄 내부 RAG 검색 시작...")
-                docs = self.internal_retriever.get_relevant_documents(enhanced_query)
-                times["internal_search"] = time.time() - start
-                self.logger.info(f"✅ 내부 RAG 검색 완료: {times['internal_search']:.2f}초, {len(docs)}개 문서")
-                return docs
-            except Exception as e:
-                times["internal_search"] = time.time() - start
-                self.logger.error(f"❌ 내부 RAG 검색 오류 ({times['internal_search']:.2f}초): {e}")
-                return []
+        internal_retriever = MetadataAwareRetriever(base_retriever)
+        self.hybrid_retriever = hybrid_retriever
+        self.internal_retriever = internal_retriever
+        return internal_retriever
 
-        internal_docs = _search_internal()
+    def _lookup_search_cache(self, query: str, character_info: Optional[Dict]):
+        """쿼리 강화 후 캐시 조회 → (강화된 쿼리, 캐시된 결과 또는 None)"""
+        # 캐릭터 정보로 쿼리 강화
+        enhanced_query = self.text_processor.enhance_query_with_character(query, character_info)
         
-        times["internal_search"] = time.time() - search_start_time
+        # 캐시 확인 (검색 결과는 강화된 쿼리로만 결정되므로 같은 직업이면 명성과 무관하게 공유)
+        cached_result = self.cache_manager.get_cached_search_result(enhanced_query, 'rag_search')
+        if cached_result:
+            self.logger.debug("🔄 캐시된 RAG 검색 결과 사용")
+        return enhanced_query, cached_result
+
+    @staticmethod
+    def _semantic_scope(character_info: Optional[Dict]) -> str:
+        """의미 캐시 공유 범위 (직업이 다르면 비슷한 질문이라도 결과를 공유하지 않음)"""
+        return (character_info or {}).get("job") or ""
+
+    def _semantic_cache_get(self, enhanced_query: str, character_info: Optional[Dict], embedding) -> Optional[Dict[str, Any]]:
+        result = self.semantic_cache.get(self._semantic_scope(character_info), embedding)
+        if result is None:
+            return None
+        self.logger.debug(f"🔄 의미 캐시 적중: '{enhanced_query}' → '{result['enhanced_query']}'")
+        return {**result, "used_semantic_cache": True}
+
+    def _lookup_semantic_cache(self, enhanced_query: str, character_info: Optional[Dict]) -> Optional[Dict[str, Any]]:
+        """정확히 같은 쿼리가 없을 때 의미가 같은 쿼리의 검색 결과 조회"""
+        if self.semantic_cache is None:
+            return None
+        try:
+            embedding = self.query_embedder.embed_query(enhanced_query)
+        except Exception as e:
+            self.logger.warning(f"⚠️ 의미 캐시 조회 실패: {e}")
+            return None
+        return self._semantic_cache_get(enhanced_query, character_info, embedding)
+
+    async def _alookup_semantic_cache(self, enhanced_query: str, character_info: Optional[Dict]) -> Optional[Dict[str, Any]]:
+        """_lookup_semantic_cache의 비동기 버전"""
+        if self.semantic_cache is None:
+            return None
+        try:
+            embedding = await self.query_embedder.aembed_query(enhanced_query)
+        except Exception as e:
+            self.logger.warning(f"⚠️ 의미 캐시 조회 실패: {e}")
+            return None
+        return self._semantic_cache_get(enhanced_query, character_info, embedding)
+
+    def _finish_search(self, enhanced_query: str, internal_docs: List, search_start_time: float,
+                       search_k: int, character_info: Optional[Dict] = None) -> Dict[str, Any]:
+        """검색 결과 구성 및 캐시 저장"""
+        times = {"internal_search": time.time() - search_start_time, "search_k": search_k}
+        self._search_latencies.append(times["internal_search"])
         self.logger.debug(f"🎯 내부 검색 완료 - 총 {times['internal_search']:.2f}초")
 
         # 검색 결과를 컨텍스트 문자열로 변환
@@ -344,89 +503,134 @@ class StructuredRAGService:
         }
         
         # 캐시에 저장
-        self.cache_manager.save_search_result_to_cache(query, result, 'rag_search', character_info)
+        self.cache_manager.save_search_result_to_cache(enhanced_query, result, 'rag_search')
+        if self.semantic_cache is not None and internal_docs:
+            # 조회 때 계산한 임베딩이 있을 때만 저장 (추가 API 호출 없음)
+            embedding = self.query_embedder.get_cached(enhanced_query)
+            if embedding is not None:
+                self.semantic_cache.put(self._semantic_scope(character_info), embedding, result)
         return result
 
-    def get_answer(self, query: str, character_info: Optional[Dict] = None, conversation_history: Optional[List[Dict]] = None) -> Dict[str, Any]:
-        """RAG 답변 생성 (메인 API)"""
-        total_start_time = time.time()
+    def rag_search(self, query: str, character_info: Optional[Dict]) -> Dict[str, Any]:
+        search_start_time = time.time()
+        enhanced_query, cached_result = self._lookup_search_cache(query, character_info)
+        if cached_result:
+            return cached_result
+        cached_result = self._lookup_semantic_cache(enhanced_query, character_info)
+        if cached_result:
+            return cached_result
+
+        search_k = self._choose_search_k()
+        internal_retriever = self._build_internal_retriever(query, character_info, search_k)
+        start = time.time()
+        try:
+            self.logger.debug("🔄 내부 RAG 검색 시작...")
+            internal_docs = internal_retriever.get_relevant_documents(enhanced_query)
+            self.logger.info(f"✅ 내부 RAG 검색 완료: {time.time() - start:.2f}초, {len(internal_docs)}개 문서")
+        except Exception as e:
+            self.logger.error(f"❌ 내부 RAG 검색 오류 ({time.time() - start:.2f}초): {e}")
+            internal_docs = []
         
-        self.logger.info(f"질문 처리 시작: \"{query}\"")
+        return self._finish_search(enhanced_query, internal_docs, search_start_time, search_k, character_info)
+
+    async def arag_search(self, query: str, character_info: Optional[Dict]) -> Dict[str, Any]:
+        """rag_search의 비동기 버전 (검색기 체인을 ainvoke로 실행)"""
+        search_start_time = time.time()
+        enhanced_query, cached_result = self._lookup_search_cache(query, character_info)
+        if cached_result:
+            return cached_result
+        cached_result = await self._alookup_semantic_cache(enhanced_query, character_info)
+        if cached_result:
+            return cached_result
+
+        search_k = self._choose_search_k()
+        internal_retriever = self._build_internal_retriever(query, character_info, search_k)
+        start = time.time()
+        try:
+            self.logger.debug("🔄 내부 RAG 검색 시작...")
+            internal_docs = await internal_retriever.aget_relevant_documents(enhanced_query)
+            self.logger.info(f"✅ 내부 RAG 검색 완료: {time.time() - start:.2f}초, {len(internal_docs)}개 문서")
+        except Exception as e:
+            self.logger.error(f"❌ 내부 RAG 검색 오류 ({time.time() - start:.2f}초): {e}")
+            internal_docs = []
         
-        # 이전 대화 기록 로그 출력
-        if conversation_history and len(conversation_history) > 0:
-            self.logger.info(f"이전 대화 기록: {len(conversation_history)}개 메시지")
-        else:
-            self.logger.info("이전 대화 기록 없음")
+        return self._finish_search(enhanced_query, internal_docs, search_start_time, search_k, character_info)
 
+    def _format_prompt(self, query: str, character_info: Optional[Dict],
+                       conversation_history: Optional[List[Dict]], search_results: Dict[str, Any]) -> str:
+        """검색 결과/캐릭터 정보/대화 기록으로 LLM 프롬프트 구성"""
         # 캐릭터 정보를 LLM용 컨텍스트로 변환
         char_context_for_llm = self.text_processor.build_character_context_for_llm(character_info)
         
         # 이전 대화 기록을 LLM용 컨텍스트로 변환
         conversation_context_for_llm = self._build_conversation_context_for_llm(conversation_history)
         
-        # 검색 수행
-        search_results = self.rag_search(query, character_info)
-        
-        # LLM 답변 생성
-        llm_start_time = time.time()
-        self.logger.info("🔄 LLM 답변 생성 중...")
+        return self._render_prompt({
+            "internal_context": search_results["internal_context_provided_to_llm"],
+            "question": query,
+            "character_info": char_context_for_llm,
+            "conversation_history": conversation_context_for_llm,
+        })
+
+    def _build_generate_config(self):
+        """LLM 호출 설정 (웹 검색 그라운딩 도구 포함)"""
+        from google.genai.types import Tool, GenerateContentConfig, GoogleSearch
+        
+        # 그라운딩 도구 설정
+        tools = []
+        if self.enable_web_grounding:
+            google_search_tool = Tool(
+                google_search = GoogleSearch()
+            )
+            tools.append(google_search_tool)
+            self.logger.info("🔍 웹 검색 그라운딩 활성화됨")
+        else:
+            self.logger.info("🚫 웹 검색 그라운딩 비활성화됨")
         
-        formatted_prompt = self.prompt.format(
-            internal_context=search_results["internal_context_provided_to_llm"],
-            question=query,
-            character_info=char_context_for_llm,
-            conversation_history=conversation_context_for_llm
+        return GenerateContentConfig(
+            system_instruction=self.system_instruction,
+            tools=tools,
+            temperature=0,
         )
+
+    def _extract_llm_response(self, response) -> str:
+        """LLM 응답에서 텍스트 추출"""
+        llm_response = ""
+        for part in response.candidates[0].content.parts:
+            if part.text:
+                llm_response += part.text
+        
+        # 그라운딩 메타데이터 확인
+        if self.enable_web_grounding and hasattr(response.candidates[0], 'grounding_metadata'):
+            grounding = response.candidates[0].grounding_metadata
+            if hasattr(grounding, 'search_entry_point') and grounding.search_entry_point:
+                self.logger.info("🌐 웹 검색 그라운딩이 실제로 사용되었습니다!")
+        return llm_response
+
+    def _llm_error_response(self, e: Exception) -> str:
+        self.logger.error(f"❌ LLM 답변 생성 오류: {e}")
+        self.logger.error(f"상세 에러: {str(e)}")
+        self.logger.error(f"에러 타입: {type(e).__name__}")
+        return "죄송합니다, 답변을 생성하는 중 오류가 발생했습니다."
+
+    def _log_question(self, query: str, conversation_history: Optional[List[Dict]]):
+        self.logger.info(f"질문 처리 시작: \"{query}\"")
         
-        try:
-            from google.genai.types import Tool, GenerateContentConfig, GoogleSearch
-            
-            # 그라운딩 도구 설정
-            tools = []
-            if self.enable_web_grounding:
-                google_search_tool = Tool(
-                    google_search = GoogleSearch()
-                )
-                tools.append(google_search_tool)
-                self.logger.info("🔍 웹 검색 그라운딩 활성화됨")
-            else:
-                self.logger.info("🚫 웹 검색 그라운딩 비활성화됨")
-            
-            # LLM 호출
-            response = self.genai_client.models.generate_content(
-                model=self.llm_model_name,
-                contents=formatted_prompt,
-                config=GenerateContentConfig(
-                    tools=tools,
-                    temperature=0,
-                )
-            )
-            
-            # 응답에서 텍스트 추출
-            llm_response = ""
-            for part in response.candidates[0].content.parts:
-                if part.text:
-                    llm_response += part.text
-            
-            # 그라운딩 메타데이터 확인
-            if self.enable_web_grounding and hasattr(response.candidates[0], 'grounding_metadata'):
-                grounding = response.candidates[0].grounding_metadata
-                if hasattr(grounding, 'search_entry_point') and grounding.search_entry_point:
-                    self.logger.info("🌐 웹 검색 그라운딩이 실제로 사용되었습니다!")
-        except Exception as e:
-            self.logger.error(f"❌ LLM 답변 생성 오류: {e}")
-            self.logger.error(f"상세 에러: {str(e)}")
-            self.logger.error(f"에러 타입: {type(e).__name__}")
-            llm_response = "죄송합니다, 답변을 생성하는 중 오류가 발생했습니다."
+        # 이전 대화 기록 로그 출력
+        if conversation_history and len(conversation_history) > 0:
+            self.logger.info(f"이전 대화 기록: {len(conversation_history)}개 메시지")
+        else:
+            self.logger.info("이전 대화 기록 없음")
 
+    def _build_answer(self, llm_response: str, search_results: Dict[str, Any],
+                      total_start_time: float, llm_start_time: float) -> Dict[str, Any]:
+        """FastAPI 엔드포인트에서 기대하는 키로 반환값 구성"""
         llm_elapsed_time = time.time() - llm_start_time
         total_elapsed_time = time.time() - total_start_time
         
         self.logger.info(f"✅ LLM 답변 생성 완료 ({llm_elapsed_time:.2f}초)")
         self.logger.info(f"총 처리 시간: {total_elapsed_time:.2f}초")
         
-        # FastAPI 엔드포인트에서 기대하는 키로 반환값 구성
         return {
             "result": llm_response,
             "internal_docs": search_results["internal_docs"],
@@ -439,6 +643,93 @@ class StructuredRAGService:
             "internal_context": search_results["internal_context_provided_to_llm"],
         }
 
+    def get_answer(self, query: str, character_info: Optional[Dict] = None, conversation_history: Optional[List[Dict]] = None) -> Dict[str, Any]:
+        """RAG 답변 생성 (메인 API)"""
+        total_start_time = time.time()
+        self._log_question(query, conversation_history)
+        
+        # 검색 수행
+        search_results = self.rag_search(query, character_info)
+        
+        # LLM 답변 생성
+        llm_start_time = time.time()
+        self.logger.info("🔄 LLM 답변 생성 중...")
+        formatted_prompt = self._format_prompt(query, character_info, conversation_history, search_results)
+        
+        try:
+            response = self.genai_client.models.generate_content(
+                model=self.llm_model_name,
+                contents=formatted_prompt,
+                config=self._build_generate_config()
+            )
+            llm_response = self._extract_llm_response(response)
+        except Exception as e:
+            llm_response = self._llm_error_response(e)
+
+        return self._build_answer(llm_response, search_results, total_start_time, llm_start_time)
+
+    async def aget_answer(self, query: str, character_info: Optional[Dict] = None, conversation_history: Optional[List[Dict]] = None) -> Dict[str, Any]:
+        """RAG 답변 생성 (비동기 API) - 이벤트 루프를 막지 않고 검색/LLM 호출"""
+        total_start_time = time.time()
+        self._log_question(query, conversation_history)
+        
+        # 검색 수행
+        search_results = await self.arag_search(query, character_info)
+        
+        # LLM 답변 생성
+        llm_start_time = time.time()
+        self.logger.info("🔄 LLM 답변 생성 중...")
+        formatted_prompt = self._format_prompt(query, character_info, conversation_history, search_results)
+        
+        try:
+            response = await self.genai_client.aio.models.generate_content(
+                model=self.llm_model_name,
+                contents=formatted_prompt,
+                config=self._build_generate_config()
+            )
+            llm_response = self._extract_llm_response(response)
+        except Exception as e:
+            llm_response = self._llm_error_response(e)
+
+        return self._build_answer(llm_response, search_results, total_start_time, llm_start_time)
+
+    async def astream_answer(self, query: str, character_info: Optional[Dict] = None,
+                             conversation_history: Optional[List[Dict]] = None) -> AsyncIterator[str]:
+        """RAG 답변 스트리밍 (비동기) - 검색 후 LLM 응답을 생성되는 대로 텍스트 조각으로 전달
+
+        전체 답변을 기다리지 않으므로 첫 글자까지의 시간이 LLM 생성 시간만큼 줄어든다.
+        """
+        total_start_time = time.time()
+        self._log_question(query, conversation_history)
+        
+        # 검색 수행
+        search_results = await self.arag_search(query, character_info)
+        
+        # LLM 답변 스트리밍
+        llm_start_time = time.time()
+        self.logger.info("🔄 LLM 답변 스트리밍 중...")
+        formatted_prompt = self._format_prompt(query, character_info, conversation_history, search_results)
+        
+        first_chunk_time = None
+        try:
+            stream = await self.genai_client.aio.models.generate_content_stream(
+                model=self.llm_model_name,
+                contents=formatted_prompt,
+                config=self._build_generate_config()
+            )
+            async for chunk in stream:
+                if not chunk.text:
+                    continue
+                if first_chunk_time is None:
+                    first_chunk_time = time.time()
+                    self.logger.info(f"⚡ 첫 응답 조각 수신 ({first_chunk_time - total_start_time:.2f}초)")
+                yield chunk.text
+        except Exception as e:
+            yield self._llm_error_response(e)
+        
+        self.logger.info(f"✅ LLM 답변 스트리밍 완료 ({time.time() - llm_start_time:.2f}초)")
+        self.logger.info(f"총 처리 시간: {time.time() - total_start_time:.2f}초")
+
 
 # 싱글톤 인스턴스 관리
 _structured_rag_service_instance: Optional[StructuredRAGService] = None
@@ -456,3 +747,13 @@ def get_structured_rag_answer(query: str, character_info: Optional[Dict] = None,
     """구조화된 RAG 답변 생성 함수"""
     service = get_structured_rag_service()
     return service.get_answer(query, character_info, conversation_history)
+
+async def aget_structured_rag_answer(query: str, character_info: Optional[Dict] = None, conversation_history: Optional[List[Dict]] = None) -> Dict[str, Any]:
+    """구조화된 RAG 답변 생성 함수 (비동기)"""
+    service = get_structured_rag_service()
+    return await service.aget_answer(query, character_info, conversation_history)
+
+def astream_structured_rag_answer(query: str, character_info: Optional[Dict] = None, conversation_history: Optional[List[Dict]] = None) -> AsyncIterator[str]:
+    """구조화된 RAG 답변 스트리밍 함수 (비동기 제너레이터 반환)"""
+    service = get_structured_rag_service()
+    return service.astream_answer(query, character_info, conversation_history)
@@ -1,11 +1,61 @@
 """
 RAG 시스템을 위한 텍스트 및 검색 처리 유틸리티
 """
-from typing import Dict, List, Optional
+import io
+import logging
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
 from langchain.docstore.document import Document
 from utils import get_logger
 
 
+@lru_cache(maxsize=4096)
+def _enhance_query(query: str, job: Optional[str]) -> str:
+    """(쿼리, 직업)별 강화 쿼리 - 같은 조합이 반복되므로 결과를 캐시"""
+    if not job:
+        return query
+    
+    # 별칭 없이 직업명만 붙인다
+    enhanced = f"{query} {job}"
+    logger = get_logger(__name__)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"쿼리 강화: '{query}' → '{enhanced}'")
+    return enhanced
+
+
+@lru_cache(maxsize=128)
+def _render_character_context(items: Tuple[Tuple[str, Any], ...]) -> str:
+    """(키, 값) 튜플로 고정한 캐릭터 정보를 LLM용 컨텍스트 문자열로 변환"""
+    character_info = dict(items)
+    details = []
+    if job_info := character_info.get('job'):
+        details.append(f"- 직업: {job_info}")
+    if fame_info := character_info.get('fame'):
+        details.append(f"- 명성: {fame_info}")
+    if weapon_info := character_info.get('weapon'):
+        details.append(f"- 무기: {weapon_info}")
+    if epic_num := character_info.get('epicNum'):
+        details.append(f"- 에픽 아이템 개수: {epic_num}")
+    if originality_num := character_info.get('originalityNum'):
+        details.append(f"- 태초 아이템 개수: {originality_num}")
+    if title_info := character_info.get('title'):
+        details.append(f"- 칭호: {title_info}")
+    if set_item_name := character_info.get('set_item_name'):
+        set_rarity = character_info.get('set_item_rarity', '')
+        details.append(f"- 세트 아이템: {set_item_name} ({set_rarity} 등급)")
+    if creature_info := character_info.get('creature'):
+        details.append(f"- 크리쳐: {creature_info}")
+    if aura_info := character_info.get('aura'):
+        details.append(f"- 오라: {aura_info}")
+
+    if details:
+        char_context = "사용자 캐릭터 정보:\n" + "\n".join(details)
+        char_context += "\n\n위 캐릭터 정보를 고려하여 맞춤형 조언을 제공하세요."
+        return char_context
+    else:
+        return "캐릭터 정보가 제공되었으나, 세부 내용을 파악할 수 없습니다."
+
+
 class TextProcessor:
     """텍스트 처리 관련 기능을 담당하는 클래스"""
     
@@ -15,70 +65,42 @@ class TextProcessor:
         캐릭터 정보로 검색 쿼리 강화 (단순화 버전)
         필수적인 정보만 추가하여 노이즈 감소
         """
-        logger = get_logger(__name__)
-        
         if not character_info:
             return query
-
-        # 기본 쿼리
-        enhanced_parts = [query]
-        
-        if job := character_info.get("job"):
-            # 별칭 없이 직업명만 붙인다
-            enhanced_parts.append(job)
-        
-        # 최종 조립
-        enhanced = " ".join(enhanced_parts)
-        logger.debug(f"쿼리 강화: '{query}' → '{enhanced}'")
-        return enhanced
+        return _enhance_query(query, character_info.get("job"))
 
     
     @staticmethod
     def format_docs_to_context_string(docs: List[Document], context_type: str) -> str:
-        """문서 리스트를 컨텍스트 문자열로 변환"""
-        context_parts = []
+        """문서 리스트를 컨텍스트 문자열로 변환
+
+        검색 캐시 적중 시에는 캐시에 저장된 문자열을 그대로 쓰므로 이 함수는 캐시 미스에서만 호출된다.
+        문서별 중간 문자열을 만들지 않고 버퍼에 바로 기록한다.
+        """
+        buf = io.StringIO()
+        write = buf.write
         for i, doc in enumerate(docs):
-            content = f"[{context_type} 문서 {i+1}] {doc.page_content}"
+            if i:
+                write("\n\n")
+            write(f"[{context_type} 문서 {i+1}] ")
+            write(doc.page_content)
             if doc.metadata and (url := doc.metadata.get("url")):
-                content += f"\n참고 링크: {url}"
-            context_parts.append(content)
-        return "\n\n".join(context_parts)
+                write("\n참고 링크: ")
+                write(url)
+        return buf.getvalue()
     
 
     
     @staticmethod
     def build_character_context_for_llm(character_info: Optional[Dict]) -> str:
-        """캐릭터 정보를 LLM용 컨텍스트로 변환"""
+        """캐릭터 정보를 LLM용 컨텍스트로 변환 (같은 캐릭터 정보면 캐시된 문자열 재사용)"""
         if not character_info:
             return "캐릭터 정보 없음."
-        
-        details = []
-        if job_info := character_info.get('job'):
-            details.append(f"- 직업: {job_info}")
-        if fame_info := character_info.get('fame'):
-            details.append(f"- 명성: {fame_info}")
-        if weapon_info := character_info.get('weapon'):
-            details.append(f"- 무기: {weapon_info}")
-        if epic_num := character_info.get('epicNum'):
-            details.append(f"- 에픽 아이템 개수: {epic_num}")
-        if originality_num := character_info.get('originalityNum'):
-            details.append(f"- 태초 아이템 개수: {originality_num}")
-        if title_info := character_info.get('title'):
-            details.append(f"- 칭호: {title_info}")
-        if set_item_name := character_info.get('set_item_name'):
-            set_rarity = character_info.get('set_item_rarity', '')
-            details.append(f"- 세트 아이템: {set_item_name} ({set_rarity} 등급)")
-        if creature_info := character_info.get('creature'):
-            details.append(f"- 크리쳐: {creature_info}")
-        if aura_info := character_info.get('aura'):
-            details.append(f"- 오라: {aura_info}")
-
-        if details:
-            char_context = "사용자 캐릭터 정보:\n" + "\n".join(details)
-            char_context += "\n\n위 캐릭터 정보를 고려하여 맞춤형 조언을 제공하세요."
-            return char_context
-        else:
-            return "캐릭터 정보가 제공되었으나, 세부 내용을 파악할 수 없습니다."
+        try:
+            return _render_character_context(tuple(sorted(character_info.items())))
+        except TypeError:
+            # 해시할 수 없는 값(리스트 등)이 섞여 있으면 캐시 없이 생성
+            return _render_character_context.__wrapped__(tuple(character_info.items()))
     
     @staticmethod
     def build_character_context_for_search(character_info: Optional[Dict]) -> str:
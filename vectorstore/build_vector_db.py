@@ -1,14 +1,16 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import logging
 import sys
 import shutil
+import uuid
 import numpy as np
 from pathlib import Path
 sys.path.append(str(Path(__file__).resolve().parent.parent))
 from config import config
-from typing import Dict, List, Set, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 from datetime import datetime
 
 from langchain.docstore.document import Document
@@ -20,10 +22,12 @@ from langchain_chroma import Chroma
 PROCESSED_DOCS_PATH       = Path(config.PROCESSED_DOCS_PATH)
 VECTOR_DB_DIR             = config.VECTOR_DB_DIR
 VECTORDB_CACHE_PATH       = Path(config.VECTORDB_CACHE_PATH)
+VECTOR_INDEX_PATH         = Path(config.VECTOR_INDEX_PATH)
 JOB_EMBEDDINGS_PATH       = Path(config.JOB_EMBEDDINGS_PATH)
 JOB_NAMES_PATH            = Path(config.JOB_NAMES_PATH)
 EMBED_MODEL_NAME          = config.EMBED_MODEL_NAME
 EMBED_BATCH_SIZE          = config.EMBED_BATCH_SIZE
+EMBED_CONCURRENCY         = max(1, config.EMBED_CONCURRENCY)
 JOB_SIMILARITY_THRESHOLD  = config.JOB_SIMILARITY_THRESHOLD
 
 logging.basicConfig(
@@ -275,6 +279,59 @@ def classify_existing_documents():
 # ───────────────────────────────────────────────
 # 4️⃣ 메인 함수
 
+async def embed_and_add_documents(vectordb, embedding_fn, all_docs: List[Document]) -> Tuple[int, Set[str]]:
+    """EMBED_CONCURRENCY개 배치씩 동시에 임베딩한 뒤 벡터DB에 저장
+
+    세마포어로 동시 요청 수를 제한하며, 실패한 배치는 건너뛴다.
+    반환값: (저장된 문서 수, 저장된 doc_id 집합)
+    """
+    total = len(all_docs)
+    processed_count = 0
+    new_doc_ids = set()
+    semaphore = asyncio.Semaphore(EMBED_CONCURRENCY)
+
+    async def embed_one(batch_num: int, batch: List[Document]) -> Optional[List[List[float]]]:
+        async with semaphore:
+            try:
+                return await embedding_fn.aembed_documents([doc.page_content for doc in batch])
+            except Exception as e:
+                log.error(f"❌ 배치 {batch_num} 임베딩 실패: {e}")
+                return None
+
+    batches = [all_docs[i:i + EMBED_BATCH_SIZE] for i in range(0, total, EMBED_BATCH_SIZE)]
+    for wave_start in range(0, len(batches), EMBED_CONCURRENCY):
+        wave = batches[wave_start:wave_start + EMBED_CONCURRENCY]
+        log.info(f"📦 배치 {wave_start + 1}~{wave_start + len(wave)}: "
+                 f"{sum(map(len, wave))}개 문서 임베딩 중...")
+        wave_embeddings = await asyncio.gather(*(
+            embed_one(wave_start + offset + 1, batch) for offset, batch in enumerate(wave)
+        ))
+        
+        for offset, (batch, embeddings) in enumerate(zip(wave, wave_embeddings)):
+            batch_num = wave_start + offset + 1
+            if embeddings is None:
+                continue
+            try:
+                vectordb._collection.add(
+                    ids=[str(uuid.uuid4()) for _ in batch],
+                    embeddings=embeddings,
+                    documents=[doc.page_content for doc in batch],
+                    metadatas=[doc.metadata for doc in batch],
+                )
+                processed_count += len(batch)
+                
+                for doc in batch:
+                    doc_id = doc.metadata.get('doc_id', '')
+                    if doc_id:
+                        new_doc_ids.add(doc_id)
+                
+                log.info(f"✅ 배치 {batch_num} 완료 ({processed_count}/{total})")
+            except Exception as e:
+                log.error(f"❌ 배치 {batch_num} 실패: {e}")
+                continue
+    
+    return processed_count, new_doc_ids
+
 def load_docs(path: Path, existing_ids: Set[str] = None) -> List[Document]:
     """문서 로드 (증분 처리)"""
     docs = []
@@ -365,34 +422,11 @@ def main():
     total = len(all_docs)
     log.info(f"📄 {total}개 새 문서 로딩 완료")
     
-    # 배치 임베딩 & 업로드
-    log.info("🔄 배치 임베딩 시작")
-    processed_count = 0
-    new_doc_ids = set()
-    
-    for i in range(0, total, EMBED_BATCH_SIZE):
-        batch = all_docs[i:i + EMBED_BATCH_SIZE]
-        batch_num = i // EMBED_BATCH_SIZE + 1
-        log.info(f"📦 배치 {batch_num}: {len(batch)}개 문서 처리 중...")
-        
-        try:
-            vectordb.add_documents(batch)
-            processed_count += len(batch)
-            
-            for doc in batch:
-                doc_id = doc.metadata.get('doc_id', '')
-                if doc_id:
-                    new_doc_ids.add(doc_id)
-            
-            log.info(f"✅ 배치 {batch_num} 완료 ({processed_count}/{total})")
-            
-            if i + EMBED_BATCH_SIZE < total:
-                import time
-                time.sleep(0.5)
-                
-        except Exception as e:
-            log.error(f"❌ 배치 {batch_num} 실패: {e}")
-            continue
+    # 배치 임베딩 & 업로드 (EMBED_CONCURRENCY개 배치씩 동시 임베딩 후 저장)
+    log.info(f"🔄 배치 임베딩 시작 (동시 {EMBED_CONCURRENCY}개 배치)")
+    processed_count, new_doc_ids = asyncio.run(
+        embed_and_add_documents(vectordb, embedding_fn, all_docs)
+    )
     
     # 캐시 업데이트
     if new_doc_ids:
@@ -400,6 +434,20 @@ def main():
         save_vectordb_cache(updated_ids)
         log.info(f"💾 캐시 업데이트: 총 {len(updated_ids)}개 문서 ID 저장")
     
+    # FAISS HNSW 인덱스 재생성 (faiss 미설치 시 RAG 서비스가 Chroma MMR 사용)
+    if processed_count:
+        try:
+            from rag.search_factory import SearcherFactory, faiss
+            if faiss is not None:
+                SearcherFactory.build_faiss_index(
+                    vectordb, VECTOR_INDEX_PATH, quantizer=config.VECTOR_INDEX_QUANTIZER.lower()
+                )
+        except Exception as e:
+            # 이전 인덱스가 남아 있으면 바뀐 컬렉션과 맞지 않는 ID를 반환하므로 삭제
+            for stale_path in (VECTOR_INDEX_PATH, VECTOR_INDEX_PATH.with_suffix(".ids.json")):
+                stale_path.unlink(missing_ok=True)
+            log.warning(f"⚠️ FAISS 인덱스 생성 실패 (서비스 시작 시 재생성): {e}")
+    
     # 완료 메시지
     log.info(f"🎉 벡터 DB 저장 완료 → {VECTOR_DB_DIR}")
     log.info(f"📈 새로 추가된 문서: {processed_count}개")